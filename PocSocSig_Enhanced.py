@@ -14,12 +14,17 @@ Optimized for binary options trading on PocketOption.
 """
 
 import asyncio
+import functools
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import random
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from queue import SimpleQueue
+import atexit
 import warnings
 import signal
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from collections import deque
 import re
 import io
@@ -38,14 +43,16 @@ from src.config import CONFIG, get_bot_token, get_api_keys, get_openai_client as
 from src.models.state import (
     SUBSCRIBED_USERS, STATS, SIGNAL_HISTORY, user_languages,
     user_expiration_preferences,
-    stats_lock, history_lock, config_lock, USER_RATE_LIMITS, user_rate_lock,
+    stats_lock, history_lock, USER_RATE_LIMITS,
     CACHE_MAX_SIZE, ALERT_HISTORY, API_CACHE
 )
 from src.database import (
-    init_database, save_signal_to_db, load_recent_signals_from_db,
+    init_database, save_signal_to_db, load_recent_signals_from_db, load_backtest_stats_from_db,
     save_stats_to_db, backup_database, DB_PATH,
     add_subscriber_to_db, remove_subscriber_from_db,
-    load_subscribers_into_state
+    load_subscribers_into_state, start_subscriber_writer, stop_subscriber_writer,
+    ping_database, start_signal_writer, stop_signal_writer,
+    close_database, maintain_database
 )
 from src.api import fetch_forex_data
 from src.signals import generate_signal, main_analysis
@@ -57,15 +64,18 @@ from src.monitoring import (
 from src.telegram import TEXTS, get_main_keyboard, language_keyboard, get_expiration_keyboard, get_symbol_keyboard
 from src.telegram.decorators import require_subscription, with_error_handling, get_user_locale
 from src.utils.http_session import close_http_session, get_http_session, http_session
-from src.utils.helpers import sanitize_user_input, validate_config_input
+from src.utils.helpers import (
+    safe_divide, is_successful_status, format_time, sanitize_user_input, validate_config_input
+)
 from src.utils.audit import log_config_change, log_security_event, log_admin_action
 from src.signals import utils as signal_utils_module
 from src.signals.utils import (
+    check_rate_limit,
     check_user_rate_limit,
     cleanup_user_rate_limits,
     clean_markdown,
 )
-from typing import Tuple, Optional, Any, Union, Set
+from typing import Tuple, Optional, Any, Union, FrozenSet
 
 # Backwards compatibility for tests expecting these symbols at module scope
 from src.models.state import METRICS  # re-export shared metrics dictionary
@@ -79,18 +89,25 @@ aiosqlite = _aiosqlite
 
 
 def is_trading_hours():
-    """Backwards-compatible wrapper that honors patched datetime in tests."""
-    signal_utils_module.datetime = datetime
+    """Backwards-compatible wrapper around src.signals.utils.is_trading_hours."""
     return signal_utils_module.is_trading_hours()
 
 
 def get_local_time():
-    """Backwards-compatible wrapper that honors patched datetime/timedelta in tests."""
-    signal_utils_module.datetime = datetime
-    signal_utils_module.timedelta = timedelta
+    """Backwards-compatible wrapper around src.signals.utils.get_local_time."""
     return signal_utils_module.get_local_time()
 
 
+def _default_bot():
+    """Module-level bot, resolved at call time (parameters shadow the global name)."""
+    return bot
+
+
+def _default_texts():
+    """Module-level TEXTS, resolved at call time (parameters shadow the global name)."""
+    return TEXTS
+
+
 async def send_signal_message(
     signal_data,
     lang: str = 'ru',
@@ -98,8 +115,8 @@ async def send_signal_message(
     TEXTS=None
 ):
     """Wrapper that defaults to global bot/TEXTS for older tests."""
-    active_bot = bot or globals().get("bot")
-    texts = TEXTS if TEXTS is not None else globals().get("TEXTS")
+    active_bot = bot or _default_bot()
+    texts = TEXTS if TEXTS is not None else _default_texts()
     if active_bot is None or texts is None:
         raise ValueError("bot and TEXTS must be provided to send_signal_message")
     return await messaging_module.send_signal_message(
@@ -118,8 +135,8 @@ async def send_signal_to_user(
     TEXTS=None
 ):
     """Wrapper to maintain original signature for tests."""
-    active_bot = bot or globals().get("bot")
-    texts = TEXTS if TEXTS is not None else globals().get("TEXTS")
+    active_bot = bot or _default_bot()
+    texts = TEXTS if TEXTS is not None else _default_texts()
     if active_bot is None or texts is None:
         raise ValueError("bot and TEXTS must be provided to send_signal_to_user")
     return await messaging_module.send_signal_to_user(
@@ -133,7 +150,7 @@ async def send_signal_to_user(
 
 async def send_alert(message_text: str, bot=None):
     """Wrapper that defaults to global bot for compatibility."""
-    active_bot = bot or globals().get("bot")
+    active_bot = bot or _default_bot()
     if active_bot is None:
         raise ValueError("bot must be available to send alerts")
     return await monitor_send_alert(message_text, active_bot)
@@ -141,7 +158,7 @@ async def send_alert(message_text: str, bot=None):
 
 async def check_system_health(bot=None):
     """Wrapper that defaults to global bot for compatibility."""
-    active_bot = bot or globals().get("bot")
+    active_bot = bot or _default_bot()
     if active_bot is None:
         raise ValueError("bot must be available to run health checks")
     return await monitor_check_system_health(active_bot)
@@ -157,25 +174,27 @@ bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
 scheduler = AsyncIOScheduler()
 
-# ==================== LOGGING SETUP ====================
-
-from logging.handlers import RotatingFileHandler
-import os  # Required for os.getenv() and os.makedirs()
+# ==================== ADMIN CONFIGURATION ====================
 
-# Admin configuration
-ADMIN_USER_IDS: Set[int] = set()
+ADMIN_USER_IDS: FrozenSet[int] = frozenset()
 _admin_env = os.getenv("ADMIN_USER_IDS", "").strip()
 if _admin_env:
     try:
-        ADMIN_USER_IDS = {
+        ADMIN_USER_IDS = frozenset(
             int(user_id.strip())
             for user_id in _admin_env.split(",")
             if user_id.strip()
-        }
+        )
         logging.info(f"✓ Loaded {len(ADMIN_USER_IDS)} admin chat IDs for rate reset command")
     except ValueError:
         logging.warning("⚠️  ADMIN_USER_IDS contains invalid values. Falling back to no admin restriction.")
-        ADMIN_USER_IDS = set()
+        ADMIN_USER_IDS = frozenset()
+
+
+def set_admin_user_ids(user_ids) -> None:
+    """Atomically replace the admin set (the set itself is immutable)."""
+    global ADMIN_USER_IDS
+    ADMIN_USER_IDS = frozenset(int(user_id) for user_id in user_ids)
 
 
 def is_admin(user_id: int) -> bool:
@@ -183,6 +202,8 @@ def is_admin(user_id: int) -> bool:
     return user_id in ADMIN_USER_IDS
 
 
+# ==================== LOGGING SETUP ====================
+
 # Настройка логирования с ротацией файлов
 handlers = [logging.StreamHandler()]
 
@@ -196,7 +217,12 @@ if os.getenv('RENDER') is None:
             backupCount=5,
             encoding='utf-8'
         )
-        handlers.append(file_handler)
+        # Запись на диск и ротация - в фоновом потоке, event loop не блокируется
+        _log_queue = SimpleQueue()
+        handlers.append(QueueHandler(_log_queue))
+        _log_listener = QueueListener(_log_queue, file_handler, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
         logging.info("✓ File logging enabled with rotation (logs/enhanced_bot.log)")
     except Exception as e:
         logging.warning(f"⚠️  Could not setup file logging: {e}")
@@ -212,10 +238,6 @@ logging.basicConfig(
 if not TWELVE_DATA_KEY and not ALPHA_VANTAGE_KEY:
     logging.warning("⚠️ No forex API keys found - please set TWELVE_DATA_API_KEY or ALPHA_VANTAGE_KEY in .env")
 
-# Import helper functions from modules
-from src.utils.helpers import safe_divide, is_successful_status, format_time, sanitize_user_input
-from src.signals.utils import check_rate_limit
-
 # ==================== COMMAND HANDLERS ====================
 
 @dp.message(Command("start"))
@@ -246,7 +268,7 @@ async def start_handler(message):
     default_lang = user_languages.get(chat_id, 'ru')
     user_languages[chat_id] = default_lang
     CONFIG["user_symbols"][chat_id] = "EURUSD"  # Default symbol
-    logging.info(f"User {chat_id} subscribed to signals")
+    logging.info("User %s subscribed to signals", chat_id)
 
     try:
         await add_subscriber_to_db(
@@ -255,7 +277,7 @@ async def start_handler(message):
             user_expiration_preferences.get(chat_id)
         )
     except Exception as e:
-        logging.error(f"Failed to persist subscriber {chat_id}: {e}")
+        logging.error("Failed to persist subscriber %s: %s", chat_id, e)
     
     await message.answer(TEXTS['ru']['choose_language'], reply_markup=language_keyboard)
 
@@ -291,7 +313,7 @@ async def language_handler(callback):
             user_expiration_preferences.get(callback.message.chat.id)
         )
     except Exception as e:
-        logging.error(f"Failed to update subscriber {callback.message.chat.id} language: {e}")
+        logging.error("Failed to update subscriber %s language: %s", callback.message.chat.id, e)
     
     await callback.message.answer(t['welcome'], reply_markup=get_main_keyboard(lang), parse_mode=None)
     await callback.answer()
@@ -306,38 +328,48 @@ async def metrics_handler(message):
     Shows API calls, response times, cache hit rates, GPT usage, and health status.
     """
     lang, t = get_user_locale(message)
-    async with metrics_lock:
-        uptime = (datetime.now() - METRICS["start_time"]).total_seconds()
-        hours = int(uptime // 3600)
-        minutes = int((uptime % 3600) // 60)
-        
-        # Calculate success rates
-        total_api = METRICS["api_calls"] + METRICS["api_errors"]
-        api_success_rate = safe_divide(METRICS["api_calls"], total_api, 0.0) * 100
-        
-        # Calculate GPT success rate
-        total_gpt = METRICS["gpt_calls"]
-        gpt_success_rate = safe_divide(METRICS["gpt_success"], total_gpt, 0.0) * 100
-        
-        # Calculate cache efficiency
-        total_cache = METRICS["api_cache_hits"] + METRICS["api_cache_misses"]
-        cache_hit_rate = safe_divide(METRICS["api_cache_hits"], total_cache, 0.0) * 100
-        
-        text = "📊 **Metrics / Метрики**\n\n"
-        text += f"⏱️ Uptime: {hours}h {minutes}m\n"
-        text += f"📡 API Calls: {METRICS['api_calls']}\n"
-        text += f"❌ API Errors: {METRICS['api_errors']}\n"
-        text += f"✅ API Success Rate: {api_success_rate:.1f}%\n"
-        text += f"⚡ Avg Response Time: {METRICS['avg_response_time']:.2f}s\n\n"
-        text += f"💾 Cache Hits: {METRICS['api_cache_hits']}\n"
-        text += f"💾 Cache Misses: {METRICS['api_cache_misses']}\n"
-        text += f"📈 Cache Hit Rate: {cache_hit_rate:.1f}%\n\n"
-        text += f"🤖 GPT Calls: {METRICS['gpt_calls']}\n"
-        text += f"✅ GPT Success: {METRICS['gpt_success']}\n"
-        text += f"❌ GPT Errors: {METRICS['gpt_errors']}\n"
-        text += f"📊 GPT Success Rate: {gpt_success_rate:.1f}%\n\n"
-        text += f"📈 Signals Generated: {METRICS['signals_generated']}\n"
-        text += f"👥 Subscribed Users: {len(SUBSCRIBED_USERS)}\n"
+    # Снимок METRICS; вычисления и форматирование - по копии
+    m = dict(METRICS)
+    
+    uptime = (datetime.now() - m["start_time"]).total_seconds()
+    hours = int(uptime // 3600)
+    minutes = int((uptime % 3600) // 60)
+    
+    # Calculate success rates
+    total_api = m["api_calls"] + m["api_errors"]
+    api_success_rate = safe_divide(m["api_calls"], total_api, 0.0) * 100
+    
+    # Calculate GPT success rate
+    gpt_success_rate = safe_divide(m["gpt_success"], m["gpt_calls"], 0.0) * 100
+    
+    avg_response_time = safe_divide(m["total_response_time"], m["response_count"], 0.0)
+    
+    # Calculate cache efficiency
+    total_cache = m["api_cache_hits"] + m["api_cache_misses"]
+    cache_hit_rate = safe_divide(m["api_cache_hits"], total_cache, 0.0) * 100
+    
+    text = "\n".join([
+        "📊 **Metrics / Метрики**",
+        "",
+        f"⏱️ Uptime: {hours}h {minutes}m",
+        f"📡 API Calls: {m['api_calls']}",
+        f"❌ API Errors: {m['api_errors']}",
+        f"✅ API Success Rate: {api_success_rate:.1f}%",
+        f"⚡ Avg Response Time: {avg_response_time:.2f}s",
+        "",
+        f"💾 Cache Hits: {m['api_cache_hits']}",
+        f"💾 Cache Misses: {m['api_cache_misses']}",
+        f"📈 Cache Hit Rate: {cache_hit_rate:.1f}%",
+        "",
+        f"🤖 GPT Calls: {m['gpt_calls']}",
+        f"✅ GPT Success: {m['gpt_success']}",
+        f"❌ GPT Errors: {m['gpt_errors']}",
+        f"📊 GPT Success Rate: {gpt_success_rate:.1f}%",
+        "",
+        f"📈 Signals Generated: {m['signals_generated']}",
+        f"👥 Subscribed Users: {len(SUBSCRIBED_USERS)}",
+        "",
+    ])
     
     await message.answer(text, parse_mode=None)
 
@@ -353,11 +385,11 @@ async def stop_handler(message):
         try:
             await remove_subscriber_from_db(chat_id)
         except Exception as e:
-            logging.error(f"Failed to remove subscriber {chat_id} from database: {e}")
+            logging.error("Failed to remove subscriber %s from database: %s", chat_id, e)
         user_expiration_preferences.pop(chat_id, None)
         CONFIG["user_symbols"].pop(chat_id, None)
         await message.answer(t['unsubscribed'])
-        logging.info(f"User {chat_id} unsubscribed from signals")
+        logging.info("User %s unsubscribed from signals", chat_id)
     else:
         await message.answer(t['not_subscribed'])
 
@@ -368,16 +400,17 @@ async def _run_manual_signal(chat_id: int, lang: str, t: dict) -> None:
     from src.utils.symbols import normalize_symbol
     
     # Get and normalize symbol to ensure consistency
-    raw_symbol = CONFIG["user_symbols"].get(chat_id, "EURUSD")
-    logging.info(f"Generating signal for user {chat_id}: raw_symbol={raw_symbol}, stored symbols={CONFIG['user_symbols'].get(chat_id)}")
+    user_symbols = CONFIG["user_symbols"]
+    raw_symbol = user_symbols.get(chat_id, "EURUSD")
+    logging.info("Generating signal for user %s: raw_symbol=%s", chat_id, raw_symbol)
     try:
         symbol = normalize_symbol(raw_symbol)
-        logging.info(f"Normalized symbol for user {chat_id}: {symbol}")
+        logging.info("Normalized symbol for user %s: %s", chat_id, symbol)
     except ValueError:
         # Fallback to EURUSD if symbol is invalid
         symbol = "EURUSD"
-        CONFIG["user_symbols"][chat_id] = symbol
-        logging.warning(f"Invalid symbol '{raw_symbol}' for user {chat_id}, defaulting to EURUSD")
+        user_symbols[chat_id] = symbol
+        logging.warning("Invalid symbol '%s' for user %s, defaulting to EURUSD", raw_symbol, chat_id)
     
     analyzing_msg = None
     try:
@@ -422,7 +455,7 @@ async def _run_manual_signal(chat_id: int, lang: str, t: dict) -> None:
     except asyncio.TimeoutError:
         await bot.send_message(chat_id, t['timeout'])
     except Exception as e:
-        logging.error(f"Error in _run_manual_signal for user {chat_id}: {e}", exc_info=True)
+        logging.error("Error in _run_manual_signal for user %s: %s", chat_id, e, exc_info=True)
         await bot.send_message(chat_id, t['error'].format(error=str(e)[:100]))
     finally:
         if analyzing_msg:
@@ -482,7 +515,7 @@ async def expiration_select_handler(callback):
             selected_seconds
         )
     except Exception as e:
-        logging.error(f"Failed to persist expiration for {chat_id}: {e}")
+        logging.error("Failed to persist expiration for %s: %s", chat_id, e)
 
     if selected_seconds >= 60:
         exp_label = t['expiration_button_minutes'].format(value=selected_seconds // 60)
@@ -500,12 +533,12 @@ async def expiration_select_handler(callback):
     try:
         await _run_manual_signal(chat_id, lang, t)
     except Exception as e:
-        logging.error(f"Error in expiration_select_handler after selecting expiration: {e}", exc_info=True)
+        logging.error("Error in expiration_select_handler after selecting expiration: %s", e, exc_info=True)
         # Send error message to user
         try:
             await bot.send_message(chat_id, t['error'].format(error=str(e)[:100]))
         except Exception as send_error:
-            logging.error(f"Failed to send error message to user {chat_id}: {send_error}")
+            logging.error("Failed to send error message to user %s: %s", chat_id, send_error)
             # Fallback: try to answer callback with error
             try:
                 await callback.answer(t.get('error', '❌ Error occurred').format(error=str(e)[:50]), show_alert=True)
@@ -542,7 +575,7 @@ async def symbol_select_handler(callback):
         # Normalize symbol before saving (EURUSD, XAUUSD)
         symbol = normalize_symbol(raw_symbol)
     except (IndexError, ValueError) as e:
-        logging.error(f"Invalid symbol in callback: {callback.data}, error: {e}")
+        logging.error("Invalid symbol in callback: %s, error: %s", callback.data, e)
         await callback.answer(t['invalid_symbol'], show_alert=True)
         return
     
@@ -553,7 +586,7 @@ async def symbol_select_handler(callback):
     
     # Save user's symbol preference (normalized)
     CONFIG["user_symbols"][chat_id] = symbol
-    logging.info(f"User {chat_id} selected symbol: {symbol} (normalized from {raw_symbol})")
+    logging.info("User %s selected symbol: %s (normalized from %s)", chat_id, symbol, raw_symbol)
     
     # Send confirmation with pair format for display (EUR/USD, XAU/USD)
     try:
@@ -605,19 +638,33 @@ async def stats_handler(message):
     else:
         api_source = "No API configured"
     
-    text = t['stats_title']
-    text += t['stats_total'].format(total=total)
-    text += t['stats_call'].format(call=buy_count)
-    text += t['stats_put'].format(put=sell_count)
-    text += t['stats_ai'].format(ai=ai_signals)
-    text += t['stats_wins'].format(wins=wins)
-    text += t['stats_losses'].format(losses=losses)
-    text += t['stats_winrate'].format(winrate=win_rate)
-    text += t['stats_api'].format(api=api_source)
-    text += t['stats_interval'].format(interval=CONFIG['analysis_interval_minutes'])
+    text = "".join((
+        t['stats_title'],
+        t['stats_total'].format(total=total),
+        t['stats_call'].format(call=buy_count),
+        t['stats_put'].format(put=sell_count),
+        t['stats_ai'].format(ai=ai_signals),
+        t['stats_wins'].format(wins=wins),
+        t['stats_losses'].format(losses=losses),
+        t['stats_winrate'].format(winrate=win_rate),
+        t['stats_api'].format(api=api_source),
+        t['stats_interval'].format(interval=CONFIG['analysis_interval_minutes']),
+    ))
     
     await message.answer(text, parse_mode=None)
 
+_SETTINGS_USAGE_TEXT = (
+    "\n💡 To change settings, use:\n"
+    "/config min_score=55\n"
+    "/config min_confidence=45\n"
+    "/config trading_hours=2-22\n"
+    "/config trading_hours=off\n"
+    "/config gpt_weight=0.10\n"
+    "/config gpt_model=gpt-4o\n"
+    "/config gpt_wait=2.0\n"
+)
+
+
 @dp.message(F.text.in_({"⚙️ НАСТРОЙКИ", "⚙️ SETTINGS"}))
 @require_subscription
 @with_error_handling
@@ -625,38 +672,89 @@ async def settings_handler(message):
     """Settings handler"""
     lang, t = get_user_locale(message)
     
-    text = t['settings_title']
-    text += t['settings_min_score'].format(score=CONFIG['min_signal_score'])
-    text += t['settings_min_conf'].format(conf=CONFIG['min_confidence'])
-    text += t['settings_ai_weight'].format(weight=int(CONFIG.get('gpt_weight', 0.1)*100))
-    text += t['settings_rr'].format(rr=CONFIG['risk_reward_ratio'])
-    text += t['settings_lookback'].format(lookback=CONFIG['lookback_window'])
-    text += t['settings_max_signals'].format(max=CONFIG['max_signals_per_hour'])
-    text += f"\n⏰ Trading Hours: {CONFIG['trading_start_hour']}:00-{CONFIG['trading_end_hour']}:00 UTC\n"
-    text += f"📊 Trading Hours Filter: {'✅ Enabled' if CONFIG['trading_hours_enabled'] else '❌ Disabled'}\n"
-    text += f"📈 Symbols: {', '.join(CONFIG['symbols'])}\n"
-    text += "\n💡 To change settings, use:\n"
-    text += "/config min_score=55\n"
-    text += "/config min_confidence=45\n"
-    text += "/config trading_hours=2-22\n"
-    text += "/config trading_hours=off\n"
-    text += "/config gpt_weight=0.10\n"
-    text += "/config gpt_model=gpt-4o\n"
-    text += "/config gpt_wait=2.0\n"
+    text = "".join((
+        t['settings_title'],
+        t['settings_min_score'].format(score=CONFIG['min_signal_score']),
+        t['settings_min_conf'].format(conf=CONFIG['min_confidence']),
+        t['settings_ai_weight'].format(weight=int(CONFIG['gpt_weight']*100)),
+        t['settings_rr'].format(rr=CONFIG['risk_reward_ratio']),
+        t['settings_lookback'].format(lookback=CONFIG['lookback_window']),
+        t['settings_max_signals'].format(max=CONFIG['max_signals_per_hour']),
+        f"\n⏰ Trading Hours: {CONFIG['trading_start_hour']}:00-{CONFIG['trading_end_hour']}:00 UTC\n",
+        f"📊 Trading Hours Filter: {'✅ Enabled' if CONFIG['trading_hours_enabled'] else '❌ Disabled'}\n",
+        f"📈 Symbols: {', '.join(CONFIG['symbols'])}\n",
+        _SETTINGS_USAGE_TEXT,
+    ))
     
     await message.answer(text, parse_mode=None)
 
+_GPT_MODEL_RE = re.compile(r"[A-Za-z0-9._-]{3,64}")
+
+
+def _in_percent_range(value) -> bool:
+    return 0 <= value <= 100
+
+
+def _is_positive(value) -> bool:
+    return value > 0
+
+
+# Границы веса GPT меняются только вместе с CONFIG - держим снимок
+_GPT_WEIGHT_MIN = CONFIG["gpt_weight_min"]
+_GPT_WEIGHT_MAX = CONFIG["gpt_weight_max"]
+
+
+def _refresh_gpt_weight_bounds() -> None:
+    """Re-read gpt_weight_min/max from CONFIG after a config change."""
+    global _GPT_WEIGHT_MIN, _GPT_WEIGHT_MAX
+    _GPT_WEIGHT_MIN = CONFIG["gpt_weight_min"]
+    _GPT_WEIGHT_MAX = CONFIG["gpt_weight_max"]
+
+
+def _in_gpt_weight_range(value) -> bool:
+    return _GPT_WEIGHT_MIN <= value <= _GPT_WEIGHT_MAX
+
+
+def _in_temperature_range(value) -> bool:
+    return 0.0 <= value <= 2.0
+
+
+def _in_timeout_range(value) -> bool:
+    return 0.1 <= value <= 30.0
+
+
+def _gpt_weight_range_text() -> str:
+    return f'{_GPT_WEIGHT_MIN:.2f}-{_GPT_WEIGHT_MAX:.2f}'
+
+
+# param -> (validator, parser, allowed range description); built once at import.
+# trading_hours and gpt_model have dedicated parsing in validate_config_value.
+_VALIDATORS = {
+    'min_score': (_in_percent_range, int, '0-100'),
+    'min_confidence': (_in_percent_range, int, '0-100'),
+    'max_signals': (_is_positive, int, 'positive integer'),
+    'gpt_weight': (_in_gpt_weight_range, float, None),
+    'gpt_temperature': (_in_temperature_range, float, '0.0-2.0'),
+    'gpt_timeout': (_in_timeout_range, float, '0.1-30.0 seconds'),
+    'gpt_wait': (_in_timeout_range, float, '0.1-30.0 seconds'),
+    'gpt_model': (None, None, 'alphanumeric/dash/underscore/dot (3-64 chars)'),
+    'trading_hours': (None, None, 'start-end (e.g., 2-22) or "off"'),
+}
+
 # Allowed configuration parameters (whitelist for security)
-ALLOWED_CONFIG_PARAMS = {
-    'min_score',
-    'min_confidence',
-    'trading_hours',
-    'max_signals',
-    'gpt_weight',
-    'gpt_model',
-    'gpt_wait',
-    'gpt_timeout',
-    'gpt_temperature',
+ALLOWED_CONFIG_PARAMS = frozenset(_VALIDATORS)
+_ALLOWED_PARAMS_SORTED = ", ".join(sorted(ALLOWED_CONFIG_PARAMS))
+
+# Простые параметры: param -> ключ CONFIG (все ключи заданы в src/config/settings.py).
+# trading_hours и gpt_weight меняют несколько ключей и обрабатываются отдельно.
+_CONFIG_PARAM_KEYS = {
+    'min_score': 'min_signal_score',
+    'min_confidence': 'min_confidence',
+    'max_signals': 'max_signals_per_hour',
+    'gpt_model': 'gpt_model',
+    'gpt_timeout': 'gpt_request_timeout',
+    'gpt_wait': 'gpt_wait_timeout',
+    'gpt_temperature': 'gpt_temperature',
 }
 
 
@@ -674,58 +772,8 @@ def validate_config_value(param: str, value: str) -> Tuple[bool, Optional[Union[
         - parsed_value: Parsed value (int for numeric params, str "off" or Tuple[int, int] for trading_hours, or None)
         - error_message: Error message if validation failed, None otherwise
     """
-    gpt_min = CONFIG.get("gpt_weight_min", 0.05)
-    gpt_max = CONFIG.get("gpt_weight_max", 0.15)
-
-    validators = {
-        'min_score': (
-            lambda v: 0 <= int(v) <= 100,
-            int,
-            '0-100'
-        ),
-        'min_confidence': (
-            lambda v: 0 <= int(v) <= 100,
-            int,
-            '0-100'
-        ),
-        'max_signals': (
-            lambda v: int(v) > 0,
-            int,
-            'positive integer'
-        ),
-        'gpt_weight': (
-            lambda v: gpt_min <= v <= gpt_max,
-            float,
-            f'{gpt_min:.2f}-{gpt_max:.2f}'
-        ),
-        'gpt_temperature': (
-            lambda v: 0.0 <= float(v) <= 2.0,
-            float,
-            '0.0-2.0'
-        ),
-        'gpt_timeout': (
-            lambda v: 0.1 <= float(v) <= 30.0,
-            float,
-            '0.1-30.0 seconds'
-        ),
-        'gpt_wait': (
-            lambda v: 0.1 <= float(v) <= 30.0,
-            float,
-            '0.1-30.0 seconds'
-        ),
-        'gpt_model': (
-            lambda v: True,
-            None,
-            'alphanumeric/dash/underscore/dot (3-64 chars)'
-        ),
-        'trading_hours': (
-            lambda v: True,  # Special handling below
-            None,
-            'start-end (e.g., 2-22) or "off"'
-        ),
-    }
-    
-    if param not in validators:
+    entry = _VALIDATORS.get(param)
+    if entry is None:
         return False, None, f"Unknown parameter: {param}"
     
     # Special handling for trading_hours
@@ -745,17 +793,19 @@ def validate_config_value(param: str, value: str) -> Tuple[bool, Optional[Union[
     
     if param == "gpt_model":
         cleaned = value.strip()
-        if not re.fullmatch(r"[A-Za-z0-9._-]{3,64}", cleaned):
+        if not _GPT_MODEL_RE.fullmatch(cleaned):
             return False, None, "Model name must be 3-64 characters (letters, digits, dot, dash, underscore)"
         return True, cleaned, None
 
     # Standard validation for other parameters
-    validator, parser, allowed_range = validators[param]
+    validator, parser, allowed_range = entry
     try:
         parsed = parser(value)
         if validator(parsed):
             return True, parsed, None
         else:
+            if allowed_range is None:
+                allowed_range = _gpt_weight_range_text()
             return False, None, f"Value must be {allowed_range}, got: {parsed}"
     except ValueError:
         return False, None, f"Invalid {parser.__name__} value: {value}"
@@ -792,7 +842,22 @@ async def config_handler(message):
         return
     
     # Парсим команду /config param=value
-    command_text = message.text
+    command_text = message.text or ""
+    
+    # Дешёвые проверки до регулярных выражений
+    if "=" not in command_text:
+        await message.answer(
+            "📝 Usage:\n"
+            "/config min_score=55\n"
+            "/config min_confidence=45\n"
+            "/config trading_hours=2-22\n"
+            "/config trading_hours=off\n"
+            "/config max_signals=15\n"
+        )
+        return
+    if len(command_text) > 200:
+        await message.answer("❌ Invalid command format")
+        return
     
     # Enhanced input validation
     if not validate_config_input(command_text):
@@ -810,17 +875,6 @@ async def config_handler(message):
         await message.answer("❌ Invalid command format")
         return
     command_text = sanitized_text
-        
-    if "=" not in command_text:
-        await message.answer(
-            "📝 Usage:\n"
-            "/config min_score=55\n"
-            "/config min_confidence=45\n"
-            "/config trading_hours=2-22\n"
-            "/config trading_hours=off\n"
-            "/config max_signals=15\n"
-        )
-        return
     
     param, value = command_text.split("=", 1)
     param = param.split()[-1].strip()  # Берем последнее слово после /config
@@ -834,7 +888,7 @@ async def config_handler(message):
             description=f'User {user_id} attempted to use unknown parameter: {param}',
             severity='low'
         )
-        await message.answer(f"❌ Unknown parameter: {param}\n\nAvailable: {', '.join(sorted(ALLOWED_CONFIG_PARAMS))}")
+        await message.answer(f"❌ Unknown parameter: {param}\n\nAvailable: {_ALLOWED_PARAMS_SORTED}")
         return
     
     # Validate parameter value using helper function
@@ -843,72 +897,45 @@ async def config_handler(message):
         await message.answer(f"❌ {error_msg}")
         return
     
-    # Обновляем CONFIG с валидацией и lock
+    # Обновляем CONFIG
     updated = False
     old_value = None
     
-    # Используем глобальный lock для безопасного изменения CONFIG
-    async with config_lock:
-        if param == "min_score":
-            old_value = CONFIG["min_signal_score"]
-            CONFIG["min_signal_score"] = parsed_value
-            updated = True
-                
-        elif param == "min_confidence":
-            old_value = CONFIG["min_confidence"]
-            CONFIG["min_confidence"] = parsed_value
-            updated = True
-                
-        elif param == "trading_hours":
-            if isinstance(parsed_value, str) and parsed_value == "off":
-                old_value = f"{CONFIG['trading_start_hour']}-{CONFIG['trading_end_hour']} (enabled)"
-                CONFIG["trading_hours_enabled"] = False
-                updated = True
-            elif isinstance(parsed_value, tuple) and len(parsed_value) == 2:
-                start, end = parsed_value
-                old_value = f"{CONFIG['trading_start_hour']}-{CONFIG['trading_end_hour']}"
-                CONFIG["trading_start_hour"] = start
-                CONFIG["trading_end_hour"] = end
-                CONFIG["trading_hours_enabled"] = True
-                updated = True
-            else:
-                await message.answer(f"❌ Invalid trading_hours value type: {type(parsed_value)}")
-                return
-                    
-        elif param == "max_signals":
-            old_value = CONFIG["max_signals_per_hour"]
-            CONFIG["max_signals_per_hour"] = parsed_value
-            updated = True
-        
-        elif param == "gpt_weight":
-            old_value = CONFIG.get("gpt_weight", CONFIG.get("gpt_weight_min", 0.05))
-            new_weight = max(0.0, min(1.0, float(parsed_value)))
-            CONFIG["gpt_weight"] = new_weight
-            CONFIG["ta_weight"] = max(0.0, min(1.0, 1.0 - new_weight))
-            parsed_value = new_weight  # normalized float for logging
-            updated = True
-        
-        elif param == "gpt_model":
-            old_value = CONFIG.get("gpt_model", "gpt-4o-mini")
-            CONFIG["gpt_model"] = parsed_value
+    # Блок без await выполняется атомарно относительно других корутин,
+    # поэтому отдельный lock для CONFIG здесь не нужен
+    config_key = _CONFIG_PARAM_KEYS.get(param)
+    if config_key is not None:
+        old_value = CONFIG[config_key]
+        CONFIG[config_key] = parsed_value
+        updated = True
+    
+    elif param == "trading_hours":
+        if isinstance(parsed_value, str) and parsed_value == "off":
+            old_value = f"{CONFIG['trading_start_hour']}-{CONFIG['trading_end_hour']} (enabled)"
+            CONFIG["trading_hours_enabled"] = False
             updated = True
-        
-        elif param == "gpt_timeout":
-            old_value = CONFIG.get("gpt_request_timeout", 3.0)
-            CONFIG["gpt_request_timeout"] = parsed_value
-            updated = True
-        
-        elif param == "gpt_wait":
-            old_value = CONFIG.get("gpt_wait_timeout", 2.0)
-            CONFIG["gpt_wait_timeout"] = parsed_value
-            updated = True
-        
-        elif param == "gpt_temperature":
-            old_value = CONFIG.get("gpt_temperature", 0.1)
-            CONFIG["gpt_temperature"] = parsed_value
+        elif isinstance(parsed_value, tuple) and len(parsed_value) == 2:
+            start, end = parsed_value
+            old_value = f"{CONFIG['trading_start_hour']}-{CONFIG['trading_end_hour']}"
+            CONFIG["trading_start_hour"] = start
+            CONFIG["trading_end_hour"] = end
+            CONFIG["trading_hours_enabled"] = True
             updated = True
     
+    elif param == "gpt_weight":
+        old_value = CONFIG["gpt_weight"]
+        new_weight = max(0.0, min(1.0, float(parsed_value)))
+        CONFIG["gpt_weight"] = new_weight
+        CONFIG["ta_weight"] = max(0.0, min(1.0, 1.0 - new_weight))
+        parsed_value = new_weight  # normalized float for logging
+        updated = True
+    
+    if param == "trading_hours" and not updated:
+        await message.answer(f"❌ Invalid trading_hours value type: {type(parsed_value)}")
+        return
+    
     if updated:
+        _refresh_gpt_weight_bounds()
         # Audit logging for config changes
         await log_config_change(user_id, param, old_value, parsed_value)
         await message.answer(f"✅ Updated: {param} = {old_value} → {parsed_value}")
@@ -927,9 +954,8 @@ async def reset_rate_handler(message):
         await message.answer("❌ Only authorized admins can reset rate limits. Set ADMIN_USER_IDS in .env.")
         return
 
-    async with user_rate_lock:
-        cleared_users = len(USER_RATE_LIMITS)
-        USER_RATE_LIMITS.clear()
+    cleared_users = len(USER_RATE_LIMITS)
+    USER_RATE_LIMITS.clear()
 
     await cleanup_user_rate_limits()
     await log_admin_action(user_id, "reset_rate_limits", {"cleared_users": cleared_users})
@@ -943,36 +969,32 @@ async def backtest_handler(message):
     """Простая система backtesting"""
     lang, t = get_user_locale(message)
     
-    # Загружаем исторические сигналы из БД
-    signals = await load_recent_signals_from_db(100)  # Последние 100 сигналов
+    # Агрегаты по последним 100 сигналам считаются в SQL
+    stats = await load_backtest_stats_from_db(100)
     
-    if len(signals) < CONFIG["backtest_min_signals"]:
+    if stats["total"] < CONFIG["backtest_min_signals"]:
         await message.answer(f"⚠️ Not enough signals for backtesting (need at least {CONFIG['backtest_min_signals']})")
         return
     
-    # Простой backtesting: считаем win rate
-    buy_signals = [s for s in signals if s['signal'] == 'BUY']
-    sell_signals = [s for s in signals if s['signal'] == 'SELL']
-    
-    # Для упрощения считаем, что сигнал успешен если confidence > 60
-    successful_buys = sum(1 for s in buy_signals if s.get('confidence', 0) > 60)
-    successful_sells = sum(1 for s in sell_signals if s.get('confidence', 0) > 60)
-    
-    total_signals = len(buy_signals) + len(sell_signals)
-    successful_total = successful_buys + successful_sells
+    # Простой backtesting: для упрощения считаем, что сигнал успешен если confidence > 60
+    empty = {"count": 0, "high_confidence": 0}
+    buy = stats["by_signal"].get("BUY", empty)
+    sell = stats["by_signal"].get("SELL", empty)
     
+    total_signals = buy["count"] + sell["count"]
+    successful_total = buy["high_confidence"] + sell["high_confidence"]
     win_rate = (successful_total / total_signals * 100) if total_signals > 0 else 0
     
-    # Средняя confidence
-    avg_confidence = sum(s.get('confidence', 0) for s in signals) / len(signals) if signals else 0
-    
-    text = "📊 **Backtesting Results**\n\n"
-    text += f"📈 Total Signals: {total_signals}\n"
-    text += f"✅ BUY Signals: {len(buy_signals)} (High confidence: {successful_buys})\n"
-    text += f"✅ SELL Signals: {len(sell_signals)} (High confidence: {successful_sells})\n\n"
-    text += f"🎯 Estimated Win Rate: {win_rate:.1f}%\n"
-    text += f"📊 Average Confidence: {avg_confidence:.1f}%\n\n"
-    text += f"⏰ Period: {signals[-1]['time'].strftime('%Y-%m-%d') if isinstance(signals[-1]['time'], datetime) else 'N/A'} to {signals[0]['time'].strftime('%Y-%m-%d') if isinstance(signals[0]['time'], datetime) else 'N/A'}\n"
+    first_time, last_time = stats["first_time"], stats["last_time"]
+    text = (
+        "📊 **Backtesting Results**\n\n"
+        f"📈 Total Signals: {total_signals}\n"
+        f"✅ BUY Signals: {buy['count']} (High confidence: {buy['high_confidence']})\n"
+        f"✅ SELL Signals: {sell['count']} (High confidence: {sell['high_confidence']})\n\n"
+        f"🎯 Estimated Win Rate: {win_rate:.1f}%\n"
+        f"📊 Average Confidence: {stats['avg_confidence']:.1f}%\n\n"
+        f"⏰ Period: {first_time.strftime('%Y-%m-%d') if first_time else 'N/A'} to {last_time.strftime('%Y-%m-%d') if last_time else 'N/A'}\n"
+    )
     
     await message.answer(text, parse_mode=None)
 
@@ -983,22 +1005,41 @@ async def history_handler(message):
     """Signal history handler"""
     lang, t = get_user_locale(message)
     
-    async with history_lock:
-        if not SIGNAL_HISTORY:
-            await message.answer(t['no_history'])
-            return
-        # Копия для безопасности (создаем внутри lock)
-        history_copy = list(SIGNAL_HISTORY)[-CONFIG["history_display_limit"]:]
-    
-    text = t['history_title']
+    # Без await между проверкой и копированием - блок атомарен для event loop
+    if not SIGNAL_HISTORY:
+        await message.answer(t['no_history'])
+        return
+    history_copy = list(SIGNAL_HISTORY)[-CONFIG["history_display_limit"]:]
     
-    for sig in history_copy:
-        time_str = format_time(sig['time'], '%H:%M')
-        symbol = sig.get('symbol', 'EURUSD')
-        text += f"{symbol} {sig['signal']} @ {sig['entry']:.5f} ({time_str})\n"
+    text = t['history_title'] + "".join(
+        f"{sig.get('symbol', 'EURUSD')} {sig['signal']} @ {sig['entry']:.5f} ({format_time(sig['time'], '%H:%M')})\n"
+        for sig in history_copy
+    )
     
     await message.answer(text, parse_mode=None)
 
+_EXPORT_CSV_HEADER = ('timestamp', 'symbol', 'signal', 'price', 'score', 'confidence', 'rsi', 'macd', 'bb_position', 'adx', 'atr')
+
+
+def _export_csv_row(sig: dict) -> tuple:
+    """Build one CSV export row from a stored signal."""
+    indicators = sig.get('indicators', {})
+    sig_time = sig['time']
+    return (
+        sig_time.isoformat() if isinstance(sig_time, datetime) else str(sig_time),
+        sig.get('symbol', 'EURUSD'),
+        sig['signal'],
+        sig['price'],
+        sig['score'],
+        sig['confidence'],
+        indicators.get('rsi', ''),
+        indicators.get('macd', ''),
+        indicators.get('bb_position', ''),
+        indicators.get('adx', ''),
+        sig.get('atr', ''),
+    )
+
+
 @dp.message(Command("export"))
 @require_subscription
 @with_error_handling
@@ -1006,43 +1047,26 @@ async def export_handler(message):
     """Export statistics to CSV/JSON"""
     lang, t = get_user_locale(message)
     
-    # Загружаем данные из БД
-    signals = await load_recent_signals_from_db(CONFIG["history_max_size"])
+    # Загружаем данные из БД (reasoning в экспорт не входит)
+    signals = await load_recent_signals_from_db(CONFIG["history_max_size"], with_reasoning=False)
     
     if not signals:
         await message.answer("No data to export")
         return
     
-    # Создаем CSV
+    # Создаем CSV одним проходом writerows по генератору строк
     output = io.StringIO()
     writer = csv.writer(output)
-    
-    # Заголовки
-    writer.writerow(['timestamp', 'symbol', 'signal', 'price', 'score', 'confidence', 'rsi', 'macd', 'bb_position', 'adx', 'atr'])
-    
-    # Данные
-    for sig in signals:
-        indicators = sig.get('indicators', {})
-        writer.writerow([
-            sig['time'].isoformat() if isinstance(sig['time'], datetime) else str(sig['time']),
-            sig.get('symbol', 'EURUSD'),  # Add symbol
-            sig['signal'],
-            sig['price'],
-            sig['score'],
-            sig['confidence'],
-            indicators.get('rsi', ''),
-            indicators.get('macd', ''),
-            indicators.get('bb_position', ''),
-            indicators.get('adx', ''),
-            sig.get('atr', ''),  # Добавляем ATR в экспорт
-        ])
+    writer.writerow(_EXPORT_CSV_HEADER)
+    writer.writerows(_export_csv_row(sig) for sig in signals)
     
     csv_data = output.getvalue()
     output.close()
     
     # Отправляем как файл
+    export_time = datetime.now()
     try:
-        file = BufferedInputFile(csv_data.encode('utf-8'), filename=f"signals_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        file = BufferedInputFile(csv_data.encode('utf-8'), filename=f"signals_export_{export_time:%Y%m%d_%H%M%S}.csv")
         await message.answer_document(file, caption=f"📊 Exported {len(signals)} signals")
     except Exception as file_error:
         # Fallback: отправляем как текст если BufferedInputFile не работает
@@ -1056,19 +1080,17 @@ async def health_handler(message):
     """Health check handler"""
     lang, t = get_user_locale(message)
     
-    async with metrics_lock:
-        metrics_snapshot = {
-            "start_time": METRICS.get("start_time"),
-            "api_calls": METRICS.get("api_calls", 0),
-            "api_errors": METRICS.get("api_errors", 0),
-            "gpt_calls": METRICS.get("gpt_calls", 0),
-            "gpt_errors": METRICS.get("gpt_errors", 0),
-            "signals_generated": METRICS.get("signals_generated", 0),
-        }
-    
-    async with stats_lock:
-        last_signal_time = STATS.get("last_signal_time")
-        subscribed_count = len(SUBSCRIBED_USERS)
+    # Снимок без блокировок: писатели METRICS/STATS не держат lock через await
+    metrics_snapshot = {
+        "start_time": METRICS.get("start_time"),
+        "api_calls": METRICS.get("api_calls", 0),
+        "api_errors": METRICS.get("api_errors", 0),
+        "gpt_calls": METRICS.get("gpt_calls", 0),
+        "gpt_errors": METRICS.get("gpt_errors", 0),
+        "signals_generated": METRICS.get("signals_generated", 0),
+    }
+    last_signal_time = STATS.get("last_signal_time")
+    subscribed_count = len(SUBSCRIBED_USERS)
     
     now = datetime.now()
     uptime_seconds = (
@@ -1102,8 +1124,7 @@ async def health_handler(message):
     
     db_status = "✅ Connected"
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("SELECT 1")
+        await ping_database()
     except Exception as db_error:
         db_status = "❌ Error"
         health_status = "❌ Unhealthy"
@@ -1116,22 +1137,26 @@ async def health_handler(message):
     else:
         last_signal_text = "N/A"
     
-    text = f"🏥 **Health Check**\n\n"
-    text += f"Status: {health_status}\n"
-    text += f"⏱️ Uptime: {hours}h {minutes}m\n"
-    text += f"👥 Subscribers: {subscribed_count}\n"
-    text += f"📡 API Calls: {metrics_snapshot['api_calls']} (errors: {metrics_snapshot['api_errors']} / {api_error_rate:.1f}%)\n"
-    text += f"🤖 GPT Calls: {metrics_snapshot['gpt_calls']} (errors: {metrics_snapshot['gpt_errors']} / {gpt_error_rate:.1f}%)\n"
-    text += f"🕒 Last Signal: {last_signal_text}\n"
-    text += f"📈 Signals Generated (session): {metrics_snapshot['signals_generated']}\n"
-    text += f"💾 Database: {db_status}\n"
-    
+    lines = [
+        "🏥 **Health Check**",
+        "",
+        f"Status: {health_status}",
+        f"⏱️ Uptime: {hours}h {minutes}m",
+        f"👥 Subscribers: {subscribed_count}",
+        f"📡 API Calls: {metrics_snapshot['api_calls']} (errors: {metrics_snapshot['api_errors']} / {api_error_rate:.1f}%)",
+        f"🤖 GPT Calls: {metrics_snapshot['gpt_calls']} (errors: {metrics_snapshot['gpt_errors']} / {gpt_error_rate:.1f}%)",
+        f"🕒 Last Signal: {last_signal_text}",
+        f"📈 Signals Generated (session): {metrics_snapshot['signals_generated']}",
+        f"💾 Database: {db_status}",
+        "",
+    ]
     if issues:
-        text += f"\n⚠️ Issues:\n"
-        for issue in issues:
-            text += f"• {issue}\n"
+        lines.append("⚠️ Issues:")
+        lines.extend(f"• {issue}" for issue in issues)
+        lines.append("")
     else:
-        text += f"\n✅ All systems operational"
+        lines.append("✅ All systems operational")
+    text = "\n".join(lines)
     
     await message.answer(text, parse_mode=None)
 
@@ -1151,6 +1176,27 @@ def setup_signal_handlers():
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
 
+def _backoff_delay(attempt: int, base: float = 0.5, cap: float = 5.0) -> float:
+    """Exponential backoff delay for a retry attempt, capped, with up to 25% jitter."""
+    delay = min(base * CONFIG["exponential_backoff_base"] ** attempt, cap)
+    return delay + random.uniform(0, delay * 0.25)
+
+
+async def _run_analysis_for_all(bot, texts):
+    """Run market analysis for all configured symbols concurrently."""
+    symbols = CONFIG["symbols"]
+    # Ограничиваем число одновременных анализов (лимиты внешних API)
+    semaphore = asyncio.Semaphore(max(1, CONFIG["max_concurrent_analyses"]))
+
+    async def _analyze(symbol):
+        async with semaphore:
+            await main_analysis(symbol=symbol, bot=bot, TEXTS=texts)
+
+    results = await asyncio.gather(*(_analyze(symbol) for symbol in symbols), return_exceptions=True)
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logging.error("Analysis failed for %s: %s", symbol, result)
+
 async def main():
     """Main entry point"""
     # Настройка graceful shutdown
@@ -1162,6 +1208,8 @@ async def main():
     
     # Инициализация базы данных
     await init_database()
+    start_subscriber_writer()
+    start_signal_writer()
     
     # Загружаем историю из БД при старте
     global SIGNAL_HISTORY
@@ -1174,22 +1222,17 @@ async def main():
     logging.info(f"Analysis Interval: {CONFIG['analysis_interval_minutes']} minutes")
 
     # Настройка scheduler и запуск первой аналитики
-    async def main_analysis_with_deps():
-        for symbol in CONFIG["symbols"]:
-            await main_analysis(symbol=symbol, bot=bot, TEXTS=TEXTS)
-
-    async def check_health_with_deps():
-        await check_system_health(bot=bot)
+    run_analysis = functools.partial(_run_analysis_for_all, bot, TEXTS)
 
     if not scheduler.running:
         scheduler.add_job(
-            main_analysis_with_deps,
+            run_analysis,
             "interval",
             minutes=CONFIG['analysis_interval_minutes'],
             id='main_analysis'
         )
         scheduler.add_job(
-            check_health_with_deps,
+            functools.partial(check_system_health, bot=bot),
             "interval",
             minutes=30,
             id='health_check'
@@ -1200,6 +1243,12 @@ async def main():
             hours=6,
             id='db_backup'
         )
+        scheduler.add_job(
+            maintain_database,
+            "interval",
+            minutes=15,
+            id='db_maintenance'
+        )
         scheduler.add_job(
             cleanup_user_rate_limits,
             "interval",
@@ -1210,47 +1259,40 @@ async def main():
         logging.info("✓ Scheduler started")
 
     # Run first analysis immediately
-    await main_analysis_with_deps()
+    await run_analysis()
     
-    # АГРЕССИВНОЕ удаление webhook перед стартом polling
-    # Пытаемся несколько раз, так как может быть конфликт с другим экземпляром
+    # Удаляем webhook перед стартом polling. Первая проверка без задержки,
+    # паузы (экспоненциальные, с jitter) только если webhook ещё на месте
     max_webhook_attempts = 5
-    webhook_deleted = False
     
     for attempt in range(max_webhook_attempts):
         try:
             logging.info(f"Checking for existing webhook (attempt {attempt + 1}/{max_webhook_attempts})...")
             webhook_info = await bot.get_webhook_info()
             
-            if webhook_info.url:
-                logging.info(f"⚠️  Found existing webhook: {webhook_info.url}")
-                logging.info("Deleting webhook to enable polling...")
-                await bot.delete_webhook(drop_pending_updates=True)
-                await asyncio.sleep(2)  # Увеличена задержка для обработки Telegram
-                
-                # Проверяем, что webhook действительно удален
-                webhook_info_check = await bot.get_webhook_info()
-                if not webhook_info_check.url:
-                    logging.info("✓ Webhook deleted successfully")
-                    webhook_deleted = True
-                    break
-                else:
-                    logging.warning(f"⚠️  Webhook still exists after deletion attempt {attempt + 1}")
-                    await asyncio.sleep(3)  # Ждем дольше перед следующей попыткой
-            else:
+            if not webhook_info.url:
                 logging.info("✓ No webhook found, polling can start")
-                webhook_deleted = True
                 break
+            
+            logging.info(f"⚠️  Found existing webhook: {webhook_info.url}")
+            logging.info("Deleting webhook to enable polling...")
+            await bot.delete_webhook(drop_pending_updates=True)
         except Exception as e:
             logging.warning(f"⚠️  Error checking/deleting webhook (attempt {attempt + 1}): {e}")
-            if attempt < max_webhook_attempts - 1:
-                await asyncio.sleep(3)  # Ждем перед следующей попыткой
-            else:
-                logging.error("❌ Failed to delete webhook after all attempts")
-    
-    # Увеличена задержка перед стартом, чтобы старый экземпляр успел завершиться
-    logging.info("Waiting 5 seconds before starting polling to ensure old instance is fully stopped...")
-    await asyncio.sleep(5)
+        
+        if attempt < max_webhook_attempts - 1:
+            await asyncio.sleep(_backoff_delay(attempt))
+    else:
+        # Последний delete_webhook не проверялся в цикле - проверяем результат
+        try:
+            webhook_cleared = not (await bot.get_webhook_info()).url
+        except Exception as e:
+            logging.warning(f"⚠️  Error checking webhook after last attempt: {e}")
+            webhook_cleared = False
+        if webhook_cleared:
+            logging.info("✓ Webhook deleted, polling can start")
+        else:
+            logging.error("❌ Failed to delete webhook after all attempts")
     
     try:
         # Start bot (aiogram автоматически обрабатывает SIGTERM/SIGINT)
@@ -1271,14 +1313,11 @@ async def main():
             try:
                 logging.info(f"Attempting to resolve conflict (retry {retry_attempt + 1}/{max_retry_attempts})...")
                 
-                # Удаляем webhook несколько раз
-                for i in range(3):
-                    await bot.delete_webhook(drop_pending_updates=True)
-                    await asyncio.sleep(2)
+                await bot.delete_webhook(drop_pending_updates=True)
                 
-                # Ждем дольше перед повторной попыткой
-                wait_time = (retry_attempt + 1) * 5
-                logging.info(f"Waiting {wait_time} seconds before retry...")
+                # Даём старому экземпляру время завершиться (экспоненциально, с jitter)
+                wait_time = _backoff_delay(retry_attempt, base=5.0, cap=30.0)
+                logging.info(f"Waiting {wait_time:.1f} seconds before retry...")
                 await asyncio.sleep(wait_time)
                 
                 logging.info("Retrying polling...")
@@ -1307,8 +1346,11 @@ async def main():
             scheduler.shutdown(wait=False)
             logging.info("✓ Scheduler stopped")
         
-        # Сохраняем статистику в БД перед завершением
+        # Дописываем отложенные сигналы, изменения подписчиков и статистику в БД
+        await stop_signal_writer()
+        await stop_subscriber_writer()
         await save_stats_to_db()
+        await close_database()
         
         # Закрываем HTTP session
         await close_http_session()
@@ -9,11 +9,13 @@
 """
 
 import os
-import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 
+# Копирование через online backup API SQLite - общий helper с ботом
+from src.database.repository import _sqlite_backup
+
 # Константы
 DB_PATH = "signals.db"
 BACKUP_DIR = "backups"
@@ -35,8 +37,8 @@ def create_backup():
     backup_path = os.path.join(BACKUP_DIR, backup_filename)
     
     try:
-        # Копируем файл БД
-        shutil.copy2(DB_PATH, backup_path)
+        # Копируем БД через backup API
+        _sqlite_backup(DB_PATH, backup_path)
         
         # Получаем размер файлов
         db_size = os.path.getsize(DB_PATH) / 1024  # KB
@@ -53,25 +55,29 @@ def create_backup():
         print(f"❌ Ошибка при создании бэкапа: {e}")
         return False
 
+def _scan_backups():
+    """Файлы бэкапов как (path, name, stat), новые сначала; один проход scandir"""
+    with os.scandir(BACKUP_DIR) as it:
+        entries = [
+            (entry.path, entry.name, entry.stat())
+            for entry in it
+            if entry.name.startswith(BACKUP_PREFIX) and entry.name.endswith('.db')
+        ]
+    entries.sort(key=lambda item: item[2].st_mtime, reverse=True)
+    return entries
+
 def cleanup_old_backups(keep_count=7):
     """Удалить старые бэкапы, оставив только последние N"""
     if not os.path.exists(BACKUP_DIR):
         return
     
-    # Получаем все файлы бэкапов
-    backup_files = []
-    for filename in os.listdir(BACKUP_DIR):
-        if filename.startswith(BACKUP_PREFIX) and filename.endswith('.db'):
-            filepath = os.path.join(BACKUP_DIR, filename)
-            backup_files.append((filepath, os.path.getmtime(filepath)))
-    
-    # Сортируем по дате изменения (новые сначала)
-    backup_files.sort(key=lambda x: x[1], reverse=True)
+    # Все файлы бэкапов, новые сначала
+    backup_files = _scan_backups()
     
     # Удаляем старые бэкапы
     if len(backup_files) > keep_count:
         deleted_count = 0
-        for filepath, _ in backup_files[keep_count:]:
+        for filepath, _, _ in backup_files[keep_count:]:
             try:
                 os.remove(filepath)
                 deleted_count += 1
@@ -89,27 +95,18 @@ def list_backups():
         print("📁 Директория бэкапов не найдена")
         return
     
-    backup_files = []
-    for filename in os.listdir(BACKUP_DIR):
-        if filename.startswith(BACKUP_PREFIX) and filename.endswith('.db'):
-            filepath = os.path.join(BACKUP_DIR, filename)
-            size = os.path.getsize(filepath) / 1024  # KB
-            mtime = os.path.getmtime(filepath)
-            backup_files.append((filepath, filename, size, mtime))
+    backup_files = _scan_backups()
     
     if not backup_files:
         print("📁 Бэкапы не найдены")
         return
     
-    # Сортируем по дате (новые сначала)
-    backup_files.sort(key=lambda x: x[3], reverse=True)
-    
     print(f"\n📦 Список бэкапов ({len(backup_files)} файлов):")
     print("-" * 70)
-    for filepath, filename, size, mtime in backup_files:
-        date_str = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+    for filepath, filename, st in backup_files:
+        date_str = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
         print(f"  📄 {filename}")
-        print(f"     Размер: {size:.2f} KB | Дата: {date_str}")
+        print(f"     Размер: {st.st_size / 1024:.2f} KB | Дата: {date_str}")
     print("-" * 70)
 
 def restore_backup(backup_filename):
@@ -123,13 +120,13 @@ def restore_backup(backup_filename):
     # Создаем бэкап текущей БД перед восстановлением
     if os.path.exists(DB_PATH):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        current_backup = f"{BACKUP_DIR}/{BACKUP_PREFIX}before_restore_{timestamp}.db"
-        shutil.copy2(DB_PATH, current_backup)
+        current_backup = os.path.join(BACKUP_DIR, f"{BACKUP_PREFIX}before_restore_{timestamp}.db")
+        _sqlite_backup(DB_PATH, current_backup)
         print(f"💾 Создан бэкап текущей БД: {current_backup}")
     
     try:
-        # Восстанавливаем из бэкапа
-        shutil.copy2(backup_path, DB_PATH)
+        # Восстанавливаем из бэкапа (backup API корректно перезаписывает WAL-базу)
+        _sqlite_backup(backup_path, DB_PATH)
         print(f"✅ База данных восстановлена из {backup_filename}")
         return True
     except Exception as e:
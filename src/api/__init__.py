@@ -1,10 +1,18 @@
 """
 API clients for forex data sources.
+
+Submodules are imported lazily (PEP 562), so importing ``src.api`` does not
+load pandas or the HTTP clients until one of the names below is used.
 """
 
-from .twelvedata import fetch_from_twelvedata
-from .alphavantage import fetch_from_alphavantage
-from .fetcher import fetch_forex_data, fetch_forex_data_parallel
+import importlib
+
+_EXPORTS = {
+    'fetch_from_twelvedata': '.twelvedata',
+    'fetch_from_alphavantage': '.alphavantage',
+    'fetch_forex_data': '.fetcher',
+    'fetch_forex_data_parallel': '.fetcher',
+}
 
 __all__ = [
     'fetch_from_twelvedata',
@@ -14,3 +22,14 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,13 +2,41 @@
 Alpha Vantage API client.
 """
 
-import pandas as pd
 import logging
 import aiohttp
-from ..utils.helpers import is_successful_status
+from ..utils.helpers import is_successful_status, json_loads
 from ..config import get_api_keys
 
 
+def parse_time_series(raw: dict):
+    """
+    Build an OHLC DataFrame from an Alpha Vantage "Time Series FX" mapping.
+    
+    Args:
+        raw: {timestamp: {"1. open": ..., "2. high": ..., ...}}
+        
+    Returns:
+        DataFrame with columns time/open/high/low/close sorted by time
+    """
+    import numpy as np
+    import pandas as pd  # отложенный импорт: pandas нужен только для разбора ответа
+    
+    # Колонки собираются из одного float64-массива (строки парсит numpy)
+    ohlc = np.array(
+        [(v["1. open"], v["2. high"], v["3. low"], v["4. close"]) for v in raw.values()],
+        dtype=np.float64
+    )
+    df = pd.DataFrame({
+        "time": list(raw),
+        "open": ohlc[:, 0],
+        "high": ohlc[:, 1],
+        "low": ohlc[:, 2],
+        "close": ohlc[:, 3],
+    })
+    df.sort_values("time", inplace=True, ignore_index=True)
+    return df
+
+
 async def fetch_from_alphavantage(pair: str, session: aiohttp.ClientSession):
     """
     Fetch data from Alpha Vantage API.
@@ -37,35 +65,24 @@ async def fetch_from_alphavantage(pair: str, session: aiohttp.ClientSession):
         "apikey": ALPHA_VANTAGE_KEY
     }
     
-    async with session.get(url, params=params, timeout=10) as resp:
+    async with session.get(url, params=params) as resp:
         if not is_successful_status(resp.status):
             raise ValueError(f"Alpha Vantage returned status {resp.status}")
-        data = await resp.json()
-        
-        if isinstance(data, dict):
-            if "Error Message" in data:
-                raise ValueError(f"Alpha Vantage error: {data['Error Message']}")
-            if "Note" in data:
-                raise ValueError(f"Alpha Vantage rate limit: {data['Note']}")
+        data = await resp.json(loads=json_loads)
         
-        if "Time Series FX (1min)" not in data:
+        if not isinstance(data, dict):
             raise ValueError("Invalid Alpha Vantage response format")
+        if "Error Message" in data:
+            raise ValueError(f"Alpha Vantage error: {data['Error Message']}")
+        if "Note" in data:
+            raise ValueError(f"Alpha Vantage rate limit: {data['Note']}")
         
-        raw = data["Time Series FX (1min)"]
+        # Один lookup: отсутствующий и пустой ряд обрабатываются одинаково
+        raw = data.get("Time Series FX (1min)")
         if not raw:
-            raise ValueError("Alpha Vantage returned empty time series")
+            raise ValueError("Invalid or empty Alpha Vantage response")
         
-        df = pd.DataFrame([
-            {
-                "time": k,
-                "open": float(v["1. open"]),
-                "high": float(v["2. high"]),
-                "low": float(v["3. low"]),
-                "close": float(v["4. close"]),
-            }
-            for k, v in raw.items()
-        ])
-        df = df.sort_values("time")
+        df = parse_time_series(raw)
         return df, "Alpha Vantage"
 
 
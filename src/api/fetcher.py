@@ -4,19 +4,150 @@ Main forex data fetcher with caching and retry logic.
 
 import asyncio
 import logging
+from functools import lru_cache
+from itertools import islice
 import aiohttp
+import numpy as np
 import pandas as pd
+import time
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
 from ..utils.http_session import get_http_session
-from ..utils.helpers import is_successful_status
 from ..utils.symbols import normalize_symbol, symbol_to_pair
 from ..config import CONFIG, get_api_keys
-from ..models.state import API_CACHE, CACHE_MAX_SIZE, cache_lock, METRICS, metrics_lock
+from ..models.state import API_CACHE, CACHE_MAX_SIZE, METRICS
 from .twelvedata import fetch_from_twelvedata
 from .alphavantage import fetch_from_alphavantage
 
 
+_OHLC_COLUMNS = ["open", "high", "low", "close"]
+
+# CONFIG["api_source"] -> клиент источника для последовательного режима
+_SOURCE_FETCHERS = {
+    "twelvedata": fetch_from_twelvedata,
+    "alphavantage": fetch_from_alphavantage,
+}
+
+
+class CachedFrame(NamedTuple):
+    """
+    API_CACHE entry: market data, its time.monotonic() deadline and hit count.
+    
+    read_only is False when the frame's buffers could not be frozen; such
+    frames are handed out as copies.
+    """
+    expires_at: float
+    data: pd.DataFrame
+    hits: int = 0
+    read_only: bool = True
+
+
+def _evict_one() -> None:
+    """
+    Evict one API_CACHE entry.
+    
+    Among the oldest 10% of entries (at least two) the least-hit entry is
+    removed, so a hot symbol survives eviction in favor of a cold one;
+    ties go to the oldest entry.
+    """
+    window = max(2, len(API_CACHE) // 10)
+    victim, _ = min(
+        islice(API_CACHE.items(), window),
+        key=lambda item: item[1].hits if isinstance(item[1], CachedFrame) else 0
+    )
+    del API_CACHE[victim]
+
+
+@lru_cache(maxsize=64)
+def _legacy_cache_keys(pair: str) -> Tuple[str, str]:
+    """Pre-"forex_data:" cache keys for pair, formatted once per pair."""
+    return f"{pair}_twelvedata", f"{pair}_alphavantage"
+
+
+def _legacy_cached_data(entry, get_adaptive_cache_duration) -> Optional[pd.DataFrame]:
+    """
+    Return data from an old-style cache entry if it is still fresh.
+    
+    Supports (timestamp, df[, atr, price]) tuples and
+    {"timestamp", "data", "atr", "price"} dicts written before CachedFrame.
+    """
+    cached_time = datetime.now()
+    cached_data = None
+    cached_atr = None
+    cached_price = None
+
+    if isinstance(entry, tuple):
+        cached_time = entry[0]
+        cached_data = entry[1]
+        cached_atr = entry[2] if len(entry) > 2 else None
+        cached_price = entry[3] if len(entry) > 3 else None
+    elif isinstance(entry, dict):
+        cached_time = entry.get("timestamp", datetime.now())
+        cached_data = entry.get("data")
+        cached_atr = entry.get("atr")
+        cached_price = entry.get("price") or entry.get("close")
+    
+    age = (datetime.now() - cached_time).total_seconds()
+    
+    # Determine adaptive cache duration based on last ATR
+    if cached_atr and cached_price:
+        adaptive_duration = get_adaptive_cache_duration(cached_atr, cached_price)
+    else:
+        adaptive_duration = CONFIG["cache_duration_seconds"]
+    
+    if age < adaptive_duration:
+        return cached_data
+    return None
+
+
+def _freeze_frame(df: pd.DataFrame) -> bool:
+    """
+    Mark the numeric column buffers of a cached DataFrame read-only.
+    
+    The cached frame is shared by every caller, so an in-place write to a
+    numpy-backed column (open/high/low/close/volume via df.loc/df.iloc)
+    raises ValueError instead of silently corrupting the cache. Columns
+    backed by extension arrays (the datetime "time" column) stay writable,
+    and adding new columns to the frame is not prevented.
+    
+    Uses the pandas block manager (df._mgr.arrays), which is not public API.
+    Returns False if it is unavailable; the caller then serves copies.
+    """
+    arrays = getattr(getattr(df, "_mgr", None), "arrays", None)
+    if arrays is None:
+        return False
+    for values in arrays:
+        # pandas не поддерживает read-only для extension-массивов (time)
+        if isinstance(values, np.ndarray):
+            values.setflags(write=False)
+    return True
+
+
+def _recent_atr(df: pd.DataFrame, period: int = 14) -> Optional[float]:
+    """
+    Mean true range over the last `period` bars (only the tail is touched).
+    
+    Used as the volatility hint for the adaptive cache TTL, so a simple mean
+    is sufficient. Returns None when it cannot be computed.
+    """
+    tail = df.iloc[-(period + 1):]
+    if len(tail) < 2:
+        return None
+    high = tail["high"].to_numpy(dtype=np.float64)
+    low = tail["low"].to_numpy(dtype=np.float64)
+    close = tail["close"].to_numpy(dtype=np.float64)
+    prev_close = close[:-1]
+    true_range = np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - prev_close),
+        np.abs(low[1:] - prev_close),
+    ])
+    atr = float(true_range.mean())
+    if not np.isfinite(atr) or atr <= 0:
+        return None
+    return atr
+
+
 async def fetch_forex_data_parallel(pair: str = "EUR/USD") -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
     Fetch forex data from multiple APIs in PARALLEL (race condition).
@@ -44,15 +175,24 @@ async def fetch_forex_data_parallel(pair: str = "EUR/USD") -> Tuple[Optional[pd.
         logging.error("No API keys configured. Please set TWELVE_DATA_API_KEY or ALPHA_VANTAGE_KEY in .env")
         return None, None
     
-    # Race all APIs - return first successful response
-    for coro in asyncio.as_completed([task[1] for task in tasks]):
-        try:
-            result = await coro
-            logging.info(f"✓ Parallel API fetch succeeded: {result[1]}")
-            return result
-        except Exception as e:
-            logging.debug(f"API attempt failed: {e}")
-            continue
+    # Race all APIs - return first successful response and cancel the rest
+    pending = {asyncio.create_task(coro, name=name) for name, coro in tasks}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logging.debug(f"API attempt failed ({task.get_name()}): {task.exception()}")
+                    continue
+                result = task.result()
+                logging.info(f"✓ Parallel API fetch succeeded: {result[1]}")
+                return result
+    finally:
+        # Проигравшие запросы отменяем, чтобы освободить соединения и квоту API
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
     
     # All APIs failed
     return None, None
@@ -69,6 +209,12 @@ async def fetch_forex_data(symbol: str = "EURUSD", max_retries: int = 3) -> Opti
     Returns:
         DataFrame с колонками ['time', 'open', 'high', 'low', 'close', 'volume']
         или None если все источники недоступны.
+        
+    Note:
+        Возвращается объект из кеша без копирования; числовые колонки (OHLCV)
+        только для чтения, запись на месте вызывает ValueError. Колонка time
+        и добавление колонок не защищены - для изменений сделать .copy().
+        Если pandas не позволяет заморозить буферы, возвращается копия.
     """
     # Normalize symbol
     try:
@@ -81,62 +227,46 @@ async def fetch_forex_data(symbol: str = "EURUSD", max_retries: int = 3) -> Opti
     # Import here to avoid circular dependency
     from ..indicators import get_adaptive_cache_duration
     
-    start_time = datetime.now()
-    TWELVE_DATA_KEY, ALPHA_VANTAGE_KEY = get_api_keys()
-    
+    start_time = time.perf_counter()
     # Check cache with adaptive duration (use normalized symbol in cache key)
     cache_key = f"forex_data:{normalized_symbol}"
-    async with cache_lock:
-        lookup_key = cache_key
-        if lookup_key not in API_CACHE:
-            legacy_keys = [
-                f"{pair}_twelvedata",
-                f"{pair}_alphavantage",
-            ]
-            for legacy_key in legacy_keys:
-                if legacy_key in API_CACHE:
-                    lookup_key = legacy_key
-                    break
+    # Чтение без блокировки: записи кеша неизменяемы и заменяются целиком,
+    # а между get() и использованием нет await. Lock нужен только на запись
+    cached_entry = API_CACHE.get(cache_key)
+    if cached_entry is None:
+        for legacy_key in _legacy_cache_keys(pair):
+            cached_entry = API_CACHE.get(legacy_key)
+            if cached_entry is not None:
+                break
 
-        if lookup_key in API_CACHE:
-            cached_entry = API_CACHE[lookup_key]
-            cached_time = datetime.now()
+    if isinstance(cached_entry, CachedFrame):
+        if cached_entry.expires_at > time.monotonic():
+            cached_data = cached_entry.data if cached_entry.read_only else cached_entry.data.copy()
+            API_CACHE[cache_key] = cached_entry._replace(hits=cached_entry.hits + 1)
+        else:
             cached_data = None
-            cached_atr = None
-            cached_price = None
-
-            if isinstance(cached_entry, tuple):
-                cached_time = cached_entry[0]
-                cached_data = cached_entry[1]
-                cached_atr = cached_entry[2] if len(cached_entry) > 2 else None
-                cached_price = cached_entry[3] if len(cached_entry) > 3 else None
-            elif isinstance(cached_entry, dict):
-                cached_time = cached_entry.get("timestamp", datetime.now())
-                cached_data = cached_entry.get("data")
-                cached_atr = cached_entry.get("atr")
-                cached_price = cached_entry.get("price") or cached_entry.get("close")
-            
-            age = (datetime.now() - cached_time).total_seconds()
-            
-            # Determine adaptive cache duration based on last ATR
-            if cached_atr and cached_price:
-                adaptive_duration = get_adaptive_cache_duration(cached_atr, cached_price)
-            else:
-                adaptive_duration = CONFIG["cache_duration_seconds"]
-            
-            if cached_data is not None and age < adaptive_duration:
-                logging.debug(f"Using cached data for {normalized_symbol} (age: {age:.1f}s, max: {adaptive_duration}s)")
-                async with metrics_lock:
-                    METRICS["api_cache_hits"] += 1
-                return cached_data.copy()
+    elif cached_entry is not None:
+        cached_data = _legacy_cached_data(cached_entry, get_adaptive_cache_duration)
+    else:
+        cached_data = None
+    
+    if cached_data is not None:
+        logging.debug(f"Using cached data for {normalized_symbol}")
+        # Инкремент без await атомарен в event loop - lock не нужен
+        METRICS["api_cache_hits"] += 1
+        return cached_data
+    
+    METRICS["api_cache_misses"] += 1
     
-    async with metrics_lock:
-        METRICS["api_cache_misses"] += 1
+    # Настройки читаются один раз на вызов, а не на каждой попытке
+    source_mode = CONFIG["api_source"]
+    lookback_window = CONFIG["lookback_window"]
+    backoff_base = CONFIG["exponential_backoff_base"]
     
     for attempt in range(max_retries):
         try:
             # PARALLEL API FALLBACK
-            if CONFIG["api_source"] == "auto":
+            if source_mode == "auto":
                 df, api_source = await fetch_forex_data_parallel(pair)
                 if df is None:
                     raise ValueError("All parallel API attempts failed")
@@ -144,130 +274,65 @@ async def fetch_forex_data(symbol: str = "EURUSD", max_retries: int = 3) -> Opti
             
             # SEQUENTIAL MODE
             else:
-                base, quote = pair.split("/")
-                url, params = None, None
-                df = None
-                api_source = CONFIG["api_source"]
+                fetch_from_source = _SOURCE_FETCHERS.get(source_mode)
+                if fetch_from_source is None:
+                    raise ValueError(f"Unknown api_source: {source_mode}")
                 session = await get_http_session()
-
-                # Twelve Data
-                if CONFIG["api_source"] == "twelvedata" and TWELVE_DATA_KEY:
-                    url = "https://api.twelvedata.com/time_series"
-                    params = {
-                        "symbol": f"{base}/{quote}",
-                        "interval": "1min",
-                        "outputsize": CONFIG["lookback_window"],
-                        "apikey": TWELVE_DATA_KEY
-                    }
-
-                # Alpha Vantage
-                elif CONFIG["api_source"] == "alphavantage" and ALPHA_VANTAGE_KEY:
-                    url = "https://www.alphavantage.co/query"
-                    params = {
-                        "function": "FX_INTRADAY",
-                        "from_symbol": base,
-                        "to_symbol": quote,
-                        "interval": "1min",
-                        "apikey": ALPHA_VANTAGE_KEY
-                    }
-                else:
-                    raise ValueError(f"No valid API source configured. Please set TWELVE_DATA_API_KEY or ALPHA_VANTAGE_KEY in .env")
-
-                async with session.get(url, params=params, timeout=10) as resp:
-                    if not is_successful_status(resp.status):
-                        error_text = await resp.text()
-                        raise ValueError(f"API returned status {resp.status}: {error_text}")
-                    data = await resp.json()
-
-                    # Parse response based on API source
-                    if isinstance(data, dict):
-                        if "values" in data:  # Twelve Data
-                            df = pd.DataFrame(data["values"])
-                            df = df.rename(columns={"datetime": "time"})
-                            for col in ['open', 'high', 'low', 'close']:
-                                df[col] = pd.to_numeric(df[col], errors='coerce')
-                            df = df[::-1]
-                        elif "Time Series FX (1min)" in data:  # Alpha Vantage
-                            raw = data["Time Series FX (1min)"]
-                            if not raw:
-                                raise ValueError("Alpha Vantage returned empty time series")
-                            df = pd.DataFrame([
-                                {
-                                    "time": k,
-                                    "open": float(v["1. open"]),
-                                    "high": float(v["2. high"]),
-                                    "low": float(v["3. low"]),
-                                    "close": float(v["4. close"]),
-                                }
-                                for k, v in raw.items()
-                            ])
-                            df = df.sort_values("time")
-                        elif "Error Message" in data:
-                            raise ValueError(f"Alpha Vantage API error: {data['Error Message']}")
-                        elif "Note" in data:
-                            raise ValueError(f"Alpha Vantage API note: {data['Note']}")
-                    else:
-                        raise ValueError(f"Unsupported API response format: {type(data)}")
+                df, api_source = await fetch_from_source(pair, session)
 
             # Clean data
             if df is None or df.empty:
                 raise ValueError("Empty dataframe")
             
-            df = df.dropna()
+            # Проверяем на NaN только цены; копия кадра - лишь если есть что отбросить
+            valid = df[_OHLC_COLUMNS].notna().all(axis=1)
+            if not valid.all():
+                df = df[valid].reset_index(drop=True)
             
             if len(df) < 10:
                 raise ValueError("Not enough valid data points after cleaning")
 
             # Successfully got data
-            result_df = df.tail(CONFIG["lookback_window"])
+            result_df = df.tail(lookback_window)
+            read_only = _freeze_frame(result_df)
             
             # Calculate ATR for adaptive caching
-            try:
-                import ta
-                temp_price = float(result_df["close"].iloc[-1])
-                temp_atr = float(ta.volatility.AverageTrueRange(
-                    result_df["high"], result_df["low"], result_df["close"]
-                ).average_true_range().iloc[-1])
-                if pd.isna(temp_atr) or temp_atr <= 0:
-                    temp_atr = temp_price * 0.001
-            except Exception:
-                temp_price = float(result_df["close"].iloc[-1])
+            temp_price = float(result_df["close"].iloc[-1])
+            temp_atr = _recent_atr(result_df)
+            if temp_atr is None:
                 temp_atr = temp_price * 0.001
             
-            # Save to cache
-            async with cache_lock:
-                cache_max = CONFIG.get("cache_max_size", CACHE_MAX_SIZE)
-                if len(API_CACHE) >= cache_max:
-                    API_CACHE.popitem(last=False)
-                
-                API_CACHE[cache_key] = (datetime.now(), result_df.copy(deep=False), temp_atr, temp_price)
-                API_CACHE.move_to_end(cache_key)
+            # Save to cache: блок без await атомарен в event loop, lock не нужен
+            cache_max = CONFIG.get("cache_max_size", CACHE_MAX_SIZE)
+            if len(API_CACHE) >= cache_max and cache_key not in API_CACHE:
+                _evict_one()
+            
+            # TTL считается один раз при записи, чтение сравнивает только срок
+            expires_at = time.monotonic() + get_adaptive_cache_duration(temp_atr, temp_price)
+            # Обновление записи сохраняет накопленные попадания
+            previous = API_CACHE.get(cache_key)
+            hits = previous.hits if isinstance(previous, CachedFrame) else 0
+            API_CACHE[cache_key] = CachedFrame(expires_at, result_df, hits, read_only)
+            API_CACHE.move_to_end(cache_key)
             
             # Update metrics
-            response_time = (datetime.now() - start_time).total_seconds()
-            async with metrics_lock:
-                METRICS["api_calls"] += 1
-                METRICS["total_response_time"] += response_time
-                METRICS["response_count"] += 1
-                if METRICS["response_count"] > 0:
-                    METRICS["avg_response_time"] = METRICS["total_response_time"] / METRICS["response_count"]
-                else:
-                    METRICS["avg_response_time"] = 0.0
+            response_time = time.perf_counter() - start_time
+            METRICS["api_calls"] += 1
+            METRICS["total_response_time"] += response_time
+            METRICS["response_count"] += 1
             
-            return result_df
+            return result_df if read_only else result_df.copy()
         
         except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
             if attempt < max_retries - 1:
-                wait_time = CONFIG["exponential_backoff_base"] ** attempt
+                wait_time = backoff_base ** attempt
                 logging.warning(f"fetch_forex_data() attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {wait_time}s...")
                 await asyncio.sleep(wait_time)
             else:
-                async with metrics_lock:
-                    METRICS["api_errors"] += 1
+                METRICS["api_errors"] += 1
                 logging.error(f"fetch_forex_data() failed after {max_retries} attempts: {e}")
         except Exception as e:
-            async with metrics_lock:
-                METRICS["api_errors"] += 1
+            METRICS["api_errors"] += 1
             logging.error(f"Unexpected error in fetch_forex_data(): {e}")
             break
     
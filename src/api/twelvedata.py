@@ -2,13 +2,40 @@
 Twelve Data API client.
 """
 
-import pandas as pd
 import logging
 import aiohttp
-from ..utils.helpers import is_successful_status
+from ..utils.helpers import is_successful_status, json_loads
 from ..config import CONFIG, get_api_keys
 
 
+_PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def parse_values(values: list):
+    """
+    Build an OHLC DataFrame from a Twelve Data "values" list.
+    
+    Only the columns used downstream are materialized (volume is kept when
+    the API returns it); rows are returned in chronological order.
+    
+    Args:
+        values: [{"datetime": ..., "open": ..., ...}, ...] newest first
+        
+    Returns:
+        DataFrame with columns time/open/high/low/close[/volume]
+    """
+    import pandas as pd  # отложенный импорт: pandas нужен только для разбора ответа
+    
+    columns = ["datetime", *_PRICE_COLUMNS]
+    if values and "volume" in values[0]:
+        columns.append("volume")
+    df = pd.DataFrame(values[::-1], columns=columns)  # Reverse to chronological order
+    df.rename(columns={"datetime": "time"}, inplace=True)
+    for col in columns[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
 async def fetch_from_twelvedata(pair: str, session: aiohttp.ClientSession):
     """
     Fetch data from Twelve Data API.
@@ -36,10 +63,10 @@ async def fetch_from_twelvedata(pair: str, session: aiohttp.ClientSession):
         "apikey": TWELVE_DATA_KEY
     }
     
-    async with session.get(url, params=params, timeout=10) as resp:
+    async with session.get(url, params=params) as resp:
         if not is_successful_status(resp.status):
             raise ValueError(f"Twelve Data returned status {resp.status}")
-        data = await resp.json()
+        data = await resp.json(loads=json_loads)
         
         if isinstance(data, dict):
             if "code" in data and data.get("code") != 200:
@@ -48,11 +75,6 @@ async def fetch_from_twelvedata(pair: str, session: aiohttp.ClientSession):
         if "values" not in data:
             raise ValueError("Invalid Twelve Data response format")
         
-        df = pd.DataFrame(data["values"])
-        df = df.rename(columns={"datetime": "time"})
-        for col in ['open', 'high', 'low', 'close']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        df = df[::-1]  # Reverse to chronological order
-        return df, "Twelve Data"
+        return parse_values(data["values"]), "Twelve Data"
 
 
@@ -3,7 +3,7 @@ Configuration management module.
 """
 
 from .env import load_environment_variables, get_bot_token, get_api_keys, get_openai_client
-from .settings import CONFIG, update_config, get_config
+from .settings import CONFIG, update_config, get_config, SymbolSettings, SYMBOL_SETTINGS
 
 __all__ = [
     'load_environment_variables',
@@ -13,6 +13,8 @@ __all__ = [
     'CONFIG',
     'update_config',
     'get_config',
+    'SymbolSettings',
+    'SYMBOL_SETTINGS',
 ]
 
 
@@ -4,14 +4,21 @@ Environment variable loading and validation.
 
 import os
 import logging
+from functools import cache
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits, Timeout
 from typing import Optional, Tuple
 
 # Load environment variables
 load_dotenv()
 
+# Пул соединений для OpenAI: keepalive между вызовами GPT/CandlesTutor.
+# Общий таймаут запроса не ограничивается: его задаёт asyncio.wait_for на каждый вызов
+# (gpt_request_timeout, до 30 с через /config); здесь только connect/pool
+OPENAI_HTTP_LIMITS = Limits(max_connections=100, max_keepalive_connections=20)
+OPENAI_HTTP_TIMEOUT = Timeout(None, connect=2.0, pool=2.0)
+
 
 def load_environment_variables() -> None:
     """
@@ -20,12 +27,19 @@ def load_environment_variables() -> None:
     This function should be called at application startup.
     """
     load_dotenv()
+    get_bot_token.cache_clear()
+    get_api_keys.cache_clear()
+    get_openai_client.cache_clear()
 
 
+@cache
 def get_bot_token() -> str:
     """
     Get Telegram bot token from environment variables.
     
+    The token is cached after the first successful read; load_environment_variables()
+    clears the cache.
+    
     Returns:
         str: Bot token
         
@@ -38,10 +52,14 @@ def get_bot_token() -> str:
     return token
 
 
+@cache
 def get_api_keys() -> Tuple[Optional[str], Optional[str]]:
     """
     Get API keys for forex data sources.
     
+    Keys are read from the environment once and cached; load_environment_variables()
+    clears the cache.
+    
     Returns:
         Tuple[Optional[str], Optional[str]]: (TWELVE_DATA_KEY, ALPHA_VANTAGE_KEY)
     """
@@ -50,10 +68,14 @@ def get_api_keys() -> Tuple[Optional[str], Optional[str]]:
     return twelvedata_key, alphavantage_key
 
 
+@cache
 def get_openai_client() -> Tuple[Optional[AsyncOpenAI], bool]:
     """
     Initialize OpenAI client if API key is available.
     
+    The client is built once and shared (it owns the HTTP connection pool);
+    load_environment_variables() clears the cache.
+    
     Returns:
         Tuple[Optional[AsyncOpenAI], bool]: (client instance or None, use_gpt flag)
     """
@@ -64,10 +86,12 @@ def get_openai_client() -> Tuple[Optional[AsyncOpenAI], bool]:
         return None, False
     
     try:
-        http_client = None
         proxy = os.getenv('HTTP_PROXY') or os.getenv('HTTPS_PROXY')
-        if proxy:
-            http_client = AsyncClient(proxies={"http://": proxy, "https://": proxy})
+        http_client = AsyncClient(
+            proxy=proxy or None,
+            limits=OPENAI_HTTP_LIMITS,
+            timeout=OPENAI_HTTP_TIMEOUT,
+        )
         client = AsyncOpenAI(api_key=openai_key, http_client=http_client)
         logging.info("✓ OpenAI API key found - GPT analysis enabled")
         return client, True
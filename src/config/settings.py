@@ -3,7 +3,8 @@ Application configuration settings.
 """
 
 import asyncio
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, NamedTuple, Set
 from .env import get_openai_client
 
 # Default GPT prompt configuration (can be overridden via CONFIG)
@@ -19,6 +20,17 @@ DEFAULT_GPT_PROMPT_TEMPLATE = (
     "Ответь ТОЛЬКО одним словом: BUY, SELL или NO_SIGNAL"
 )
 
+# GPT prompt for gold (XAU/USD): macro drivers and key levels
+XAUUSD_GPT_PROMPT_TEMPLATE = (
+    "Ты трейдер-аналитик. Анализируй пару XAU/USD (золото). "
+    "Учитывай корреляцию с DXY (обратная), новости по ФРС, инфляции, геополитике. "
+    "Уровни: 2700, 2750, 2800. Волатильность выше, чем у EUR/USD.\n"
+    "RSI: {rsi:.1f} ({rsi_state})\n"
+    "MACD: {macd:.5f} ({macd_state})\n"
+    "Цена: {price:.5f}\n\n"
+    "Ответь ТОЛЬКО одним словом: BUY, SELL или NO_SIGNAL"
+)
+
 # Default CandlesTutor system prompt
 DEFAULT_CANDLESTUTOR_SYSTEM_PROMPT = (
     "Ты специалист по анализу японских свечей (CandlesTutor). "
@@ -65,6 +77,7 @@ CONFIG: Dict[str, Any] = {
     "gpt_system_prompt": DEFAULT_GPT_SYSTEM_PROMPT,
     "lookback_window": 60,
     "max_signals_per_hour": 12,  # Увеличен лимит сигналов
+    "max_concurrent_analyses": 4,  # Сколько символов анализируется одновременно
     "max_sell_score": 40,       # Base SELL threshold (can tighten via adaptive thresholds)
     "risk_reward_ratio": 1.8,
     "cache_duration_seconds": 90,
@@ -138,6 +151,10 @@ CONFIG: Dict[str, Any] = {
     "cache_max_size": 20,               # Maximum entries in API cache (LRU eviction)
     "indicator_cache_max_size": 10,     # Maximum entries in indicator cache
     "indicator_cache_ttl_seconds": 30,  # Time-to-live for indicator cache entries
+    "gpt_cache_max_size": 64,           # Maximum cached GPT answers (LRU eviction)
+    "gpt_cache_ttl_seconds": 60,        # Reuse a GPT answer for near-identical indicators this long
+    # Database write batching
+    "db_insert_batch_size": 512,        # Max signal rows per executemany/commit
     # Symbol-specific configurations
     "symbol_configs": {
         "EURUSD": {
@@ -171,6 +188,32 @@ CONFIG: Dict[str, Any] = {
 config_lock = asyncio.Lock()
 
 
+class SymbolSettings(NamedTuple):
+    """Frozen per-symbol thresholds (snapshot of CONFIG["symbol_configs"][symbol])."""
+    min_signal_score: int
+    min_confidence: int
+    atr_multiplier: float
+    expiration_button_seconds: List[int]
+    expiration_button_layout: List[List[int]]
+
+
+def build_symbol_settings(symbol_configs: Dict[str, Dict[str, Any]]) -> Dict[str, SymbolSettings]:
+    """
+    Build SymbolSettings snapshots from a symbol_configs mapping.
+    
+    Raises:
+        KeyError: If a symbol config lacks one of the SymbolSettings fields
+    """
+    return {
+        symbol: SymbolSettings(**{field: cfg[field] for field in SymbolSettings._fields})
+        for symbol, cfg in symbol_configs.items()
+    }
+
+
+# Per-symbol snapshots; rebuilt in place by update_config("symbol_configs", ...)
+SYMBOL_SETTINGS: Dict[str, SymbolSettings] = build_symbol_settings(CONFIG["symbol_configs"])
+
+
 def get_config(key: str, default: Any = None) -> Any:
     """
     Get configuration value by key.
@@ -185,10 +228,23 @@ def get_config(key: str, default: Any = None) -> Any:
     return CONFIG.get(key, default)
 
 
+# Фоновые задачи аудита (сильные ссылки, чтобы задачи не собрал GC)
+_audit_tasks: Set[asyncio.Task] = set()
+
+
+def _on_audit_done(task: asyncio.Task) -> None:
+    _audit_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Failed to log config change to audit: {task.exception()}")
+
+
 async def update_config(key: str, value: Any, user_id: int = None) -> bool:
     """
     Update configuration value (thread-safe).
     
+    Audit logging (when user_id is given) runs as a background task after
+    config_lock is released.
+    
     Args:
         key: Configuration key
         value: New value
@@ -198,18 +254,22 @@ async def update_config(key: str, value: Any, user_id: int = None) -> bool:
         bool: True if update successful
     """
     async with config_lock:
-        if key in CONFIG:
-            old_value = CONFIG[key]
-            CONFIG[key] = value
-            # Audit logging if user_id provided
-            if user_id is not None:
-                try:
-                    from ..utils.audit import log_config_change
-                    await log_config_change(user_id, key, old_value, value)
-                except Exception as e:
-                    import logging
-                    logging.warning(f"Failed to log config change to audit: {e}")
-            return True
-        return False
-
-
+        if key not in CONFIG:
+            return False
+        if key == "symbol_configs":
+            try:
+                symbol_settings = build_symbol_settings(value)
+            except (KeyError, TypeError, AttributeError) as e:
+                logging.warning(f"Invalid symbol_configs update rejected: {e}")
+                return False
+            SYMBOL_SETTINGS.clear()
+            SYMBOL_SETTINGS.update(symbol_settings)
+        old_value = CONFIG[key]
+        CONFIG[key] = value
+    
+    if user_id is not None:
+        from ..utils.audit import log_config_change
+        task = asyncio.create_task(log_config_change(user_id, key, old_value, value))
+        _audit_tasks.add(task)
+        task.add_done_callback(_on_audit_done)
+    return True
@@ -7,11 +7,19 @@ from .repository import (
     init_database,
     save_signal_to_db,
     load_recent_signals_from_db,
+    load_backtest_stats_from_db,
     save_stats_to_db,
     backup_database,
     add_subscriber_to_db,
     remove_subscriber_from_db,
     load_subscribers_into_state,
+    start_subscriber_writer,
+    stop_subscriber_writer,
+    ping_database,
+    start_signal_writer,
+    stop_signal_writer,
+    close_database,
+    maintain_database,
 )
 
 __all__ = [
@@ -19,11 +27,19 @@ __all__ = [
     'init_database',
     'save_signal_to_db',
     'load_recent_signals_from_db',
+    'load_backtest_stats_from_db',
     'save_stats_to_db',
     'backup_database',
     'add_subscriber_to_db',
     'remove_subscriber_from_db',
     'load_subscribers_into_state',
+    'start_subscriber_writer',
+    'stop_subscriber_writer',
+    'ping_database',
+    'start_signal_writer',
+    'stop_signal_writer',
+    'close_database',
+    'maintain_database',
 ]
 
 
@@ -3,12 +3,19 @@ Database repository for signal storage and retrieval.
 """
 
 import os
-import shutil
 import logging
 import asyncio
+import heapq
+import sqlite3
+import time
 import aiosqlite
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from typing import Dict, List, Any, Optional
+from ..config import CONFIG
 from ..models.state import (
     STATS,
     stats_lock,
@@ -18,6 +25,7 @@ from ..models.state import (
 )
 
 DB_PATH = "signals.db"
+BACKUPS_TO_KEEP = 7
 
 
 async def optimize_db_connection(db: aiosqlite.Connection) -> None:
@@ -27,7 +35,10 @@ async def optimize_db_connection(db: aiosqlite.Connection) -> None:
     Sets pragmas for:
     - WAL mode: Better concurrency for reads
     - NORMAL synchronous: Good balance of safety and performance
-    - Increased cache size: Better performance for frequent queries
+    - 64MB page cache: Better performance for frequent queries
+    - In-memory temp store and 256MB mmap: fewer syscalls on reads/sorts
+    - busy_timeout: wait for locks (backup, health probe) instead of SQLITE_BUSY
+    - wal_autocheckpoint: keep the WAL file bounded
     
     Args:
         db: Database connection to optimize
@@ -35,19 +46,151 @@ async def optimize_db_connection(db: aiosqlite.Connection) -> None:
     try:
         await db.execute("PRAGMA journal_mode=WAL")
         await db.execute("PRAGMA synchronous=NORMAL")
-        await db.execute("PRAGMA cache_size=10000")
+        await db.execute("PRAGMA cache_size=-64000")
+        await db.execute("PRAGMA temp_store=MEMORY")
+        await db.execute("PRAGMA mmap_size=268435456")
+        await db.execute("PRAGMA busy_timeout=5000")
+        await db.execute("PRAGMA wal_autocheckpoint=1000")
         await db.execute("PRAGMA foreign_keys=ON")
         await db.commit()
     except Exception as e:
         logging.warning(f"Could not optimize database connection: {e}")
 
 
+# Общие долгоживущие соединения модуля: одно для записи (и DDL), одно только
+# для чтения. В WAL чтение не ждет COMMIT писателя. Открываются лениво;
+# запросы на каждом соединении сериализуются своим lock
+_db: Optional[aiosqlite.Connection] = None
+_db_lock = asyncio.Lock()
+_read_db: Optional[aiosqlite.Connection] = None
+_read_lock = asyncio.Lock()
+# Кеш подготовленных выражений sqlite3 (по точному тексту SQL), по умолчанию 128
+DB_STATEMENT_CACHE_SIZE = 256
+
+
+async def _open_connection() -> aiosqlite.Connection:
+    db = await aiosqlite.connect(DB_PATH, cached_statements=DB_STATEMENT_CACHE_SIZE)
+    await optimize_db_connection(db)
+    db.row_factory = aiosqlite.Row
+    return db
+
+
+async def _get_connection() -> aiosqlite.Connection:
+    """Return the shared writer connection, opening it on first use. Call with _db_lock held."""
+    global _db
+    if _db is None:
+        _db = await _open_connection()
+    return _db
+
+
+async def _get_read_connection() -> aiosqlite.Connection:
+    """Return the shared read-only connection, opening it on first use. Call with _read_lock held."""
+    global _read_db
+    if _read_db is None:
+        db = await _open_connection()
+        await db.execute("PRAGMA query_only=ON")
+        _read_db = db
+    return _read_db
+
+
+async def close_database() -> None:
+    """Закрыть общие соединения с БД (при остановке бота)."""
+    global _db, _read_db
+    async with _read_lock:
+        db, _read_db = _read_db, None
+        if db is not None:
+            await db.close()
+    async with _db_lock:
+        db, _db = _db, None
+        if db is not None:
+            await db.close()
+
+
+async def maintain_database() -> None:
+    """
+    Периодическое обслуживание БД: PRAGMA optimize (свежая статистика
+    планировщика) и wal_checkpoint(TRUNCATE) (WAL не растет бесконечно).
+    
+    Raises:
+        Exception: Логирует ошибку, но не прерывает работу.
+    """
+    try:
+        async with _db_lock:
+            db = await _get_connection()
+            await db.execute("PRAGMA optimize")
+            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logging.debug("Database maintenance done (optimize + WAL checkpoint)")
+    except Exception as e:
+        logging.warning(f"Database maintenance failed: {e}")
+
+
+async def ping_database() -> None:
+    """
+    Проверить доступность БД (SELECT 1) через общее соединение для чтения.
+    
+    Raises:
+        Exception: Ошибка соединения/запроса (соединение сбрасывается и
+        будет открыто заново при следующем обращении).
+    """
+    global _read_db
+    async with _read_lock:
+        try:
+            db = await _get_read_connection()
+            await db.execute("SELECT 1")
+        except Exception:
+            db, _read_db = _read_db, None
+            if db is not None:
+                try:
+                    await db.close()
+                except Exception:
+                    pass
+            raise
+
+
+async def _table_columns(db: aiosqlite.Connection, table: str) -> set:
+    """Return the column names of a table via PRAGMA table_info."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    rows = await cursor.fetchall()
+    await cursor.close()
+    return {row[1] for row in rows}
+
+
+def _signal_epoch(value: Any) -> Optional[float]:
+    """Convert a signal time (datetime or legacy ISO / '%Y-%m-%d %H:%M:%S' string) to epoch seconds."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (ValueError, TypeError):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+        except (ValueError, TypeError):
+            return None
+
+
+async def _backfill_signal_epochs(db: aiosqlite.Connection) -> None:
+    """Fill timestamp_epoch for rows written before the column existed (one-time)."""
+    cursor = await db.execute("SELECT id, timestamp FROM signals WHERE timestamp_epoch IS NULL")
+    rows = await cursor.fetchall()
+    await cursor.close()
+    updates = []
+    for row_id, timestamp_str in rows:
+        epoch = _signal_epoch(timestamp_str)
+        if epoch is None:
+            logging.warning(f"Invalid timestamp format: {timestamp_str}, signal {row_id} not backfilled")
+            continue
+        updates.append((epoch, row_id))
+    if updates:
+        await db.executemany("UPDATE signals SET timestamp_epoch = ? WHERE id = ?", updates)
+        logging.info(f"✓ Backfilled timestamp_epoch for {len(updates)} signals")
+
+
 async def init_database() -> None:
     """
     Инициализация базы данных SQLite.
     
     Создает таблицы для хранения сигналов и статистики, если они не существуют.
-    Также выполняет миграцию для добавления колонки ATR, если она отсутствует.
+    Также выполняет миграции колонок (atr, symbol, timestamp_epoch) для старых БД.
     
     Raises:
         Exception: Логирует ошибку при неудачной инициализации, но не прерывает работу.
@@ -56,9 +199,8 @@ async def init_database() -> None:
         Функция безопасна к повторному вызову - использует CREATE TABLE IF NOT EXISTS.
     """
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
+        async with _db_lock:
+            db = await _get_connection()
             # Таблица сигналов
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS signals (
@@ -76,32 +218,27 @@ async def init_database() -> None:
                 )
             """)
             
-            # Миграция: добавляем колонку atr если она не существует (для старых БД)
-            try:
+            # Миграции колонок для старых БД: схема читается один раз, ALTER только при отсутствии
+            signal_columns = await _table_columns(db, "signals")
+            if "atr" not in signal_columns:
                 await db.execute("ALTER TABLE signals ADD COLUMN atr REAL")
-                await db.commit()
                 logging.info("✓ Added ATR column to signals table")
-            except aiosqlite.OperationalError as e:
-                if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
-                    logging.debug("ATR column already exists (expected)")
-                else:
-                    logging.warning(f"Migration warning while adding ATR column: {e}")
-            except Exception as e:
-                logging.warning(f"Unexpected error during ATR migration: {e}")
-            
-            # Миграция: добавляем колонку symbol если она не существует (для старых БД)
-            try:
+            if "symbol" not in signal_columns:
                 await db.execute("ALTER TABLE signals ADD COLUMN symbol TEXT DEFAULT 'EURUSD'")
-                await db.commit()
                 logging.info("✓ Added symbol column to signals table")
-            except aiosqlite.OperationalError as e:
-                if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
-                    logging.debug("Symbol column already exists (expected)")
-                else:
-                    logging.warning(f"Migration warning while adding symbol column: {e}")
-            except Exception as e:
-                logging.warning(f"Unexpected error during symbol migration: {e}")
-            
+            # Время сигнала как Unix epoch, чтобы не парсить строки при загрузке
+            if "timestamp_epoch" not in signal_columns:
+                await db.execute("ALTER TABLE signals ADD COLUMN timestamp_epoch REAL")
+                logging.info("✓ Added timestamp_epoch column to signals table")
+            await _backfill_signal_epochs(db)
+
+            # Один индекс по timestamp_epoch для обоих чтений "последние N": покрывает
+            # _BACKTEST_STATS_SQL, а _RECENT_SIGNALS_SQL берет из него порядок и
+            # дочитывает не более LIMIT строк из таблицы
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_signals_epoch ON signals(timestamp_epoch DESC, signal, confidence)"
+            )
+
             # Таблица статистики
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS stats (
@@ -127,32 +264,128 @@ async def init_database() -> None:
             """)
 
             # Migration: ensure expiration_seconds column exists
-            try:
+            if "expiration_seconds" not in await _table_columns(db, "subscribers"):
                 await db.execute("ALTER TABLE subscribers ADD COLUMN expiration_seconds INTEGER")
-                await db.commit()
                 logging.info("✓ Added expiration_seconds column to subscribers table")
-            except aiosqlite.OperationalError as e:
-                if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
-                    logging.debug("expiration_seconds column already exists (expected)")
-                else:
-                    logging.warning(f"Migration warning while adding expiration_seconds column: {e}")
-            except Exception as e:
-                logging.warning(f"Unexpected error during expiration_seconds migration: {e}")
             
             await db.commit()
             logging.info("✓ Database initialized")
-        finally:
-            await db.close()
         
         await load_subscribers_into_state()
     except Exception as e:
         logging.error(f"Database initialization error: {e}")
 
 
+_INSERT_SIGNAL_SQL = """
+    INSERT INTO signals (timestamp, signal, price, score, confidence, reasoning, rsi, macd, entry, atr, symbol,
+                         timestamp_epoch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Write-behind очередь сигналов: INSERT-ы пишутся пакетами одной транзакцией
+SIGNAL_FLUSH_INTERVAL = 1.0
+_signal_queue: Optional[asyncio.Queue] = None
+_signal_writer_task: Optional[asyncio.Task] = None
+
+
+def _iso(value: Any) -> str:
+    """ISO string for datetimes, str() for anything already serialized."""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _signal_row(signal_data: Dict[str, Any]) -> tuple:
+    indicators = signal_data.get("indicators", {})
+    return (
+        _iso(signal_data["time"]),
+        signal_data["signal"],
+        signal_data["price"],
+        signal_data["score"],
+        signal_data["confidence"],
+        signal_data.get("reasoning", ""),
+        indicators.get("rsi"),
+        indicators.get("macd"),
+        signal_data.get("entry", signal_data["price"]),
+        signal_data.get("atr"),
+        signal_data.get("symbol", "EURUSD"),
+        _signal_epoch(signal_data["time"]),
+    )
+
+
+async def _write_signals(rows: List[tuple]) -> bool:
+    """Insert a batch of signal rows in a single transaction. Returns True on commit."""
+    try:
+        async with _db_lock:
+            db = await _get_connection()
+            await db.executemany(_INSERT_SIGNAL_SQL, rows)
+            await db.commit()
+    except Exception as e:
+        logging.error(f"Error saving {len(rows)} signals to database: {e}")
+        return False
+    return True
+
+
+def _drain_signal_queue(queue: asyncio.Queue, pending: List[tuple]) -> bool:
+    """Move queued signal rows into pending. Returns True on stop sentinel."""
+    while True:
+        try:
+            row = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return False
+        if row is None:
+            return True
+        pending.append(row)
+
+
+async def _signal_writer(queue: asyncio.Queue, batch_size: int) -> None:
+    """Background task that writes queued signals in batches of up to batch_size rows."""
+    stop = False
+    while not stop:
+        row = await queue.get()
+        pending: List[tuple] = []
+        if row is None:
+            stop = True
+        else:
+            pending.append(row)
+        stop = _drain_signal_queue(queue, pending) or stop
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            if await _write_signals(batch):
+                for row in batch:
+                    _remember_signal(row)
+        if not stop:
+            await asyncio.sleep(SIGNAL_FLUSH_INTERVAL)
+
+
+def start_signal_writer() -> None:
+    """Start the signal write-behind task (call from the running event loop)."""
+    global _signal_queue, _signal_writer_task
+    if _signal_writer_task is not None and not _signal_writer_task.done():
+        return
+    _signal_queue = asyncio.Queue()
+    batch_size = max(1, int(CONFIG.get("db_insert_batch_size", 512)))
+    _signal_writer_task = asyncio.create_task(_signal_writer(_signal_queue, batch_size))
+
+
+async def stop_signal_writer() -> None:
+    """Flush pending signal inserts and stop the writer task."""
+    global _signal_queue, _signal_writer_task
+    task, queue = _signal_writer_task, _signal_queue
+    _signal_writer_task = None
+    _signal_queue = None
+    if task is None or task.done():
+        return
+    queue.put_nowait(None)
+    await task
+
+
 async def save_signal_to_db(signal_data: Dict[str, Any]) -> None:
     """
     Сохранить торговый сигнал в базу данных.
     
+    При запущенном signal writer строка ставится в очередь и записывается
+    пакетом в фоне; иначе INSERT выполняется сразу. В буфер последних
+    сигналов строка попадает только после успешного COMMIT.
+    
     Args:
         signal_data: Словарь с данными сигнала
         
@@ -160,96 +393,204 @@ async def save_signal_to_db(signal_data: Dict[str, Any]) -> None:
         Exception: Логирует ошибку при неудачном сохранении, но не прерывает работу.
     """
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
-            indicators = signal_data.get("indicators", {})
-            await db.execute("""
-                INSERT INTO signals (timestamp, signal, price, score, confidence, reasoning, rsi, macd, entry, atr, symbol)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                signal_data["time"].isoformat() if isinstance(signal_data["time"], datetime) else str(signal_data["time"]),
-                signal_data["signal"],
-                signal_data["price"],
-                signal_data["score"],
-                signal_data["confidence"],
-                signal_data.get("reasoning", ""),
-                indicators.get("rsi"),
-                indicators.get("macd"),
-                signal_data.get("entry", signal_data["price"]),
-                signal_data.get("atr"),
-                signal_data.get("symbol", "EURUSD")
-            ))
+        row = _signal_row(signal_data)
+        if _signal_writer_task is not None and not _signal_writer_task.done():
+            _signal_queue.put_nowait(row)
+            return
+        
+        async with _db_lock:
+            db = await _get_connection()
+            await db.execute(_INSERT_SIGNAL_SQL, row)
             await db.commit()
-        finally:
-            await db.close()
+        _remember_signal(row)
     except Exception as e:
         logging.error(f"Error saving signal to database: {e}")
 
 
-async def load_recent_signals_from_db(limit: int = 100) -> List[Dict[str, Any]]:
+# Явный порядок колонок: строки читаются по индексу, без доступа по имени
+_RECENT_SIGNALS_SQL_TEMPLATE = """
+    SELECT timestamp_epoch, signal, price, score, confidence, {reasoning}, rsi, macd, entry, atr, symbol
+    FROM signals
+    WHERE timestamp_epoch IS NOT NULL
+    ORDER BY timestamp_epoch DESC
+    LIMIT ?
+"""
+_RECENT_SIGNALS_SQL = _RECENT_SIGNALS_SQL_TEMPLATE.format(reasoning="reasoning")
+# Без текста reasoning (экспорт и т.п.): позиции колонок те же, reasoning = NULL
+_RECENT_SIGNALS_NO_REASONING_SQL = _RECENT_SIGNALS_SQL_TEMPLATE.format(reasoning="NULL")
+
+
+def _signal_from_row(row) -> Dict[str, Any]:
+    """Build a signal dict from a _RECENT_SIGNALS_SQL row."""
+    epoch, signal, price, score, confidence, reasoning, rsi, macd, entry, atr, symbol = row
+    price = float(price) if price is not None else 0.0
+    return {
+        "signal": signal,
+        "price": price,
+        "score": float(score) if score is not None else 50.0,
+        "confidence": float(confidence) if confidence is not None else 0.0,
+        "reasoning": reasoning or "",
+        "time": datetime.fromtimestamp(epoch),
+        "entry": float(entry) if entry is not None else price,
+        "atr": float(atr) if atr is not None else None,
+        "symbol": symbol or "EURUSD",
+        "indicators": {
+            "rsi": float(rsi) if rsi is not None else None,
+            "macd": float(macd) if macd is not None else None
+        }
+    }
+
+
+# Кольцевой буфер последних сохранённых сигналов: "последние N" отдаются без SQLite
+RECENT_SIGNALS_BUFFER_SIZE = 1000
+_recent_signals: deque = deque(maxlen=RECENT_SIGNALS_BUFFER_SIZE)
+
+
+def _remember_signal(row: tuple) -> None:
+    """Append a committed signal row to the in-memory buffer in read form."""
+    epoch = row[-1]
+    if epoch is None:
+        return
+    _recent_signals.append(_signal_from_row((epoch,) + row[1:-1]))
+
+
+def _copy_signal(signal: Dict[str, Any], with_reasoning: bool = True) -> Dict[str, Any]:
+    """Copy of a buffered signal dict, so callers never share the buffer's objects."""
+    copy = {**signal, "indicators": dict(signal["indicators"])}
+    if not with_reasoning:
+        copy["reasoning"] = ""
+    return copy
+
+
+def _signals_from_rows(rows: List[Any]) -> List[Dict[str, Any]]:
+    """Decode rows (newest first) into signal dicts in chronological order; runs in a worker thread."""
+    signals = []
+    for row in reversed(rows):
+        try:
+            signals.append(_signal_from_row(row))
+        except Exception as e:
+            logging.error(f"Error parsing signal from database: {e}, skipping row")
+    return signals
+
+
+async def load_recent_signals_from_db(limit: int = 100, with_reasoning: bool = True) -> List[Dict[str, Any]]:
     """
     Загрузить последние сигналы из базы данных.
     
+    Если в буфере недавно сохранённых сигналов хватает записей,
+    они возвращаются без обращения к SQLite (копиями, буфер не разделяется).
+    
     Args:
         limit: Количество последних сигналов для загрузки
+        with_reasoning: Читать текст reasoning; при False поле "reasoning" пустое
         
     Returns:
         Список словарей с данными сигналов, отсортированных по времени
     """
+    if 0 < limit <= len(_recent_signals):
+        recent = list(islice(reversed(_recent_signals), limit))
+        return [_copy_signal(signal, with_reasoning) for signal in reversed(recent)]
+    
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT * FROM signals 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (limit,))
+        async with _read_lock:
+            db = await _get_read_connection()
+            sql = _RECENT_SIGNALS_SQL if with_reasoning else _RECENT_SIGNALS_NO_REASONING_SQL
+            cursor = await db.execute(sql, (limit,))
             rows = await cursor.fetchall()
             await cursor.close()
-            
-            signals = []
-            for row in rows:
-                try:
-                    timestamp_str = row["timestamp"]
-                    try:
-                        signal_time = datetime.fromisoformat(timestamp_str)
-                    except (ValueError, AttributeError):
-                        try:
-                            signal_time = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                        except (ValueError, AttributeError):
-                            logging.warning(f"Invalid timestamp format: {timestamp_str}, skipping signal")
-                            continue
-                    
-                    signals.append({
-                        "signal": row["signal"],
-                        "price": float(row["price"]) if row["price"] is not None else 0.0,
-                        "score": float(row["score"]) if row["score"] is not None else 50.0,
-                        "confidence": float(row["confidence"]) if row["confidence"] is not None else 0.0,
-                        "reasoning": row["reasoning"] or "",
-                        "time": signal_time,
-                        "entry": float(row["entry"]) if row["entry"] is not None else float(row["price"]) if row["price"] is not None else 0.0,
-                        "atr": float(row["atr"]) if row.get("atr") is not None else None,
-                        "symbol": row.get("symbol") or "EURUSD",  # Add symbol field
-                        "indicators": {
-                            "rsi": float(row["rsi"]) if row["rsi"] is not None else None,
-                            "macd": float(row["macd"]) if row["macd"] is not None else None
-                        }
-                    })
-                except Exception as e:
-                    logging.error(f"Error parsing signal from database: {e}, skipping row")
-                    continue
-            
-            signals.reverse()
-            logging.info(f"✓ Loaded {len(signals)} signals from database")
-            return signals
-        finally:
-            await db.close()
+        signals = await asyncio.to_thread(_signals_from_rows, rows)
     except Exception as e:
         logging.error(f"Error loading signals from database: {e}")
         return []
+    
+    # Первая полная загрузка (при старте) заполняет буфер
+    if with_reasoning and not _recent_signals:
+        _recent_signals.extend(_copy_signal(signal) for signal in signals)
+    
+    logging.info(f"✓ Loaded {len(signals)} signals from database")
+    return signals
+
+
+# Те же последние N строк, что и у _RECENT_SIGNALS_SQL: по timestamp_epoch,
+# строки с нераспознанным временем не учитываются
+_BACKTEST_STATS_SQL = """
+    SELECT signal,
+           COUNT(*),
+           SUM(CASE WHEN confidence > 60 THEN 1 ELSE 0 END),
+           SUM(confidence),
+           MIN(timestamp_epoch),
+           MAX(timestamp_epoch)
+    FROM (
+        SELECT signal, confidence, timestamp_epoch FROM signals
+        WHERE timestamp_epoch IS NOT NULL
+        ORDER BY timestamp_epoch DESC
+        LIMIT ?
+    )
+    GROUP BY signal
+"""
+
+
+async def load_backtest_stats_from_db(limit: int = 100) -> Dict[str, Any]:
+    """
+    Агрегированная статистика по последним сигналам для backtesting.
+    
+    Подсчет выполняется в SQLite, в Python приходит по строке на тип сигнала.
+    
+    Args:
+        limit: Количество последних сигналов для анализа
+        
+    Returns:
+        Словарь: total, avg_confidence, first_time/last_time (datetime или None)
+        и by_signal: {signal: {"count": int, "high_confidence": int}}
+    """
+    stats: Dict[str, Any] = {
+        "total": 0,
+        "avg_confidence": 0.0,
+        "first_time": None,
+        "last_time": None,
+        "by_signal": {},
+    }
+    try:
+        async with _read_lock:
+            db = await _get_read_connection()
+            cursor = await db.execute(_BACKTEST_STATS_SQL, (limit,))
+            rows = await cursor.fetchall()
+            await cursor.close()
+    except Exception as e:
+        logging.error(f"Error loading backtest stats from database: {e}")
+        return stats
+    
+    confidence_sum = 0.0
+    first_ts = last_ts = None
+    for signal, count, high_confidence, conf_sum, min_ts, max_ts in rows:
+        stats["by_signal"][signal] = {
+            "count": count,
+            "high_confidence": high_confidence or 0,
+        }
+        stats["total"] += count
+        confidence_sum += conf_sum or 0.0
+        if min_ts is not None and (first_ts is None or min_ts < first_ts):
+            first_ts = min_ts
+        if max_ts is not None and (last_ts is None or max_ts > last_ts):
+            last_ts = max_ts
+    
+    if stats["total"]:
+        stats["avg_confidence"] = confidence_sum / stats["total"]
+    for key, value in (("first_time", first_ts), ("last_time", last_ts)):
+        stats[key] = datetime.fromtimestamp(value) if value is not None else None
+    return stats
+
+
+_INSERT_STATS_SQL = """
+    INSERT INTO stats (timestamp, call_count, put_count, ai_signals, total_signals, wins, losses)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@lru_cache(maxsize=2)
+def _iso_for_sec(sec: int) -> str:
+    """Local ISO timestamp for a whole Unix second (same format as datetime.now().isoformat())."""
+    return datetime.fromtimestamp(sec).isoformat()
 
 
 async def save_stats_to_db() -> None:
@@ -260,78 +601,185 @@ async def save_stats_to_db() -> None:
         Exception: Логирует ошибку при неудачном сохранении.
     """
     try:
+        # Под stats_lock только снимок счетчиков; запись в БД идет без него
         async with stats_lock:
-            db = await aiosqlite.connect(DB_PATH)
-            await optimize_db_connection(db)
-            try:
-                await db.execute("""
-                    INSERT INTO stats (timestamp, call_count, put_count, ai_signals, total_signals, wins, losses)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    STATS.get("BUY", 0),
-                    STATS.get("SELL", 0),
-                    STATS.get("AI_signals", 0),
-                    STATS.get("total_signals", 0),
-                    STATS.get("wins", 0),
-                    STATS.get("losses", 0)
-                ))
-                await db.commit()
-            finally:
-                await db.close()
+            row = (
+                _iso_for_sec(int(time.time())),
+                STATS.get("BUY", 0),
+                STATS.get("SELL", 0),
+                STATS.get("AI_signals", 0),
+                STATS.get("total_signals", 0),
+                STATS.get("wins", 0),
+                STATS.get("losses", 0)
+            )
+        async with _db_lock:
+            db = await _get_connection()
+            await db.execute(_INSERT_STATS_SQL, row)
+            await db.commit()
     except Exception as e:
         logging.error(f"Error saving stats to database: {e}")
 
 
+def _sqlite_backup(src_path: str, dst_path: str) -> None:
+    """Consistent copy via the SQLite online backup API (includes WAL contents)."""
+    src = sqlite3.connect(src_path)
+    try:
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def _backup_database_sync() -> None:
+    """Blocking part of backup_database(): copy, rotate and log (runs in a worker thread)."""
+    if not os.path.exists(DB_PATH):
+        logging.warning(f"Database {DB_PATH} not found, skipping backup")
+        return
+    
+    backup_dir = "backups"
+    os.makedirs(backup_dir, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_filename = f"signals_backup_{timestamp}.db"
+    backup_path = os.path.join(backup_dir, backup_filename)
+    
+    _sqlite_backup(DB_PATH, backup_path)
+    
+    with os.scandir(backup_dir) as it:
+        backup_files = [
+            (entry.path, entry.stat().st_mtime)
+            for entry in it
+            if entry.name.startswith("signals_backup_") and entry.name.endswith('.db')
+        ]
+    
+    keep = {filepath for filepath, _ in heapq.nlargest(BACKUPS_TO_KEEP, backup_files, key=itemgetter(1))}
+    
+    deleted_count = 0
+    for filepath, _ in backup_files:
+        if filepath in keep:
+            continue
+        try:
+            os.remove(filepath)
+            deleted_count += 1
+        except Exception:
+            pass
+    
+    db_size = os.path.getsize(backup_path) / 1024
+    logging.info(f"✅ Database backup created: {backup_filename} ({db_size:.2f} KB)")
+    if deleted_count > 0:
+        logging.info(f"🗑️  Removed {deleted_count} old backup(s)")
+
+
 async def backup_database() -> None:
     """
     Автоматическое резервное копирование базы данных.
     
     Создает резервную копию БД в папке backups/ с временной меткой.
-    Автоматически удаляет старые бэкапы, оставляя только последние 7.
+    Автоматически удаляет старые бэкапы, оставляя только последние BACKUPS_TO_KEEP.
+    Вся файловая работа выполняется в отдельном потоке, event loop не блокируется.
     
     Raises:
         Exception: Логирует ошибку при неудачном создании бэкапа.
     """
     try:
-        if not os.path.exists(DB_PATH):
-            logging.warning(f"Database {DB_PATH} not found, skipping backup")
-            return
-        
-        backup_dir = "backups"
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"signals_backup_{timestamp}.db"
-        backup_path = os.path.join(backup_dir, backup_filename)
-        
-        shutil.copy2(DB_PATH, backup_path)
-        
-        backup_files = []
-        for filename in os.listdir(backup_dir):
-            if filename.startswith("signals_backup_") and filename.endswith('.db'):
-                filepath = os.path.join(backup_dir, filename)
-                backup_files.append((filepath, os.path.getmtime(filepath)))
-        
-        backup_files.sort(key=lambda x: x[1], reverse=True)
-        
-        deleted_count = 0
-        for filepath, _ in backup_files[7:]:
-            try:
-                os.remove(filepath)
-                deleted_count += 1
-            except Exception:
-                pass
-        
-        db_size = os.path.getsize(backup_path) / 1024
-        logging.info(f"✅ Database backup created: {backup_filename} ({db_size:.2f} KB)")
-        if deleted_count > 0:
-            logging.info(f"🗑️  Removed {deleted_count} old backup(s)")
-            
+        await asyncio.to_thread(_backup_database_sync)
     except Exception as e:
         logging.error(f"Error creating database backup: {e}")
 
 
+_UPSERT_SUBSCRIBER_SQL = """
+    INSERT INTO subscribers (chat_id, language, expiration_seconds, subscribed_at)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(chat_id) DO UPDATE SET
+        language=excluded.language,
+        expiration_seconds=excluded.expiration_seconds,
+        subscribed_at=excluded.subscribed_at
+"""
+
+_DELETE_SUBSCRIBER_SQL = "DELETE FROM subscribers WHERE chat_id = ?"
+
+_SELECT_SUBSCRIBERS_SQL = """
+    SELECT chat_id, language, expiration_seconds
+    FROM subscribers
+"""
+
+# Write-behind очередь подписчиков: хендлеры не ждут SQLite.
+# Элементы очереди: строка upsert (chat_id, language, expiration_seconds, subscribed_at)
+# или tombstone (chat_id,) для удаления; по каждому chat_id побеждает последнее действие.
+SUBSCRIBER_FLUSH_INTERVAL = 1.0
+_subscriber_queue: Optional[asyncio.Queue] = None
+_subscriber_writer_task: Optional[asyncio.Task] = None
+
+
+async def _write_subscribers(rows: List[tuple]) -> None:
+    """Apply a batch of subscriber upserts and (chat_id,) tombstones in one transaction."""
+    upserts = [row for row in rows if len(row) > 1]
+    deletes = [row for row in rows if len(row) == 1]
+    try:
+        async with _db_lock:
+            db = await _get_connection()
+            if upserts:
+                await db.executemany(_UPSERT_SUBSCRIBER_SQL, upserts)
+            if deletes:
+                await db.executemany(_DELETE_SUBSCRIBER_SQL, deletes)
+            await db.commit()
+    except Exception as e:
+        logging.error(f"Error saving {len(rows)} subscribers to database: {e}")
+
+
+def _drain_subscriber_queue(queue: asyncio.Queue, pending: Dict[int, tuple]) -> bool:
+    """Move queued rows/tombstones into pending (latest per chat_id wins). Returns True on stop sentinel."""
+    while True:
+        try:
+            row = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return False
+        if row is None:
+            return True
+        pending[row[0]] = row
+
+
+async def _subscriber_writer(queue: asyncio.Queue) -> None:
+    """Background task that coalesces subscriber updates into batched writes."""
+    stop = False
+    while not stop:
+        row = await queue.get()
+        pending: Dict[int, tuple] = {}
+        if row is None:
+            stop = True
+        else:
+            pending[row[0]] = row
+        stop = _drain_subscriber_queue(queue, pending) or stop
+        if pending:
+            await _write_subscribers(list(pending.values()))
+        if not stop:
+            await asyncio.sleep(SUBSCRIBER_FLUSH_INTERVAL)
+
+
+def start_subscriber_writer() -> None:
+    """Start the subscriber write-behind task (call from the running event loop)."""
+    global _subscriber_queue, _subscriber_writer_task
+    if _subscriber_writer_task is not None and not _subscriber_writer_task.done():
+        return
+    _subscriber_queue = asyncio.Queue()
+    _subscriber_writer_task = asyncio.create_task(_subscriber_writer(_subscriber_queue))
+
+
+async def stop_subscriber_writer() -> None:
+    """Flush pending subscriber updates and stop the writer task."""
+    global _subscriber_queue, _subscriber_writer_task
+    task, queue = _subscriber_writer_task, _subscriber_queue
+    _subscriber_writer_task = None
+    _subscriber_queue = None
+    if task is None or task.done():
+        return
+    queue.put_nowait(None)
+    await task
+
+
 async def add_subscriber_to_db(
     chat_id: int,
     language: str = 'ru',
@@ -339,27 +787,25 @@ async def add_subscriber_to_db(
 ) -> None:
     """
     Persist subscriber into database.
+    
+    При запущенном write-behind writer запись ставится в очередь и
+    выполняется пакетом в фоне; иначе пишется сразу.
     """
+    row = (
+        chat_id,
+        language or 'ru',
+        expiration_seconds,
+        _iso_for_sec(int(time.time()))
+    )
+    if _subscriber_writer_task is not None and not _subscriber_writer_task.done():
+        _subscriber_queue.put_nowait(row)
+        return
+    
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
-            await db.execute("""
-                INSERT INTO subscribers (chat_id, language, expiration_seconds, subscribed_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(chat_id) DO UPDATE SET
-                    language=excluded.language,
-                    expiration_seconds=excluded.expiration_seconds,
-                    subscribed_at=excluded.subscribed_at
-            """, (
-                chat_id,
-                language or 'ru',
-                expiration_seconds,
-                datetime.now().isoformat()
-            ))
+        async with _db_lock:
+            db = await _get_connection()
+            await db.execute(_UPSERT_SUBSCRIBER_SQL, row)
             await db.commit()
-        finally:
-            await db.close()
     except Exception as e:
         logging.error(f"Error saving subscriber {chat_id} to database: {e}")
 
@@ -367,15 +813,21 @@ async def add_subscriber_to_db(
 async def remove_subscriber_from_db(chat_id: int) -> None:
     """
     Remove subscriber from database.
+    
+    При запущенном writer удаление идёт через ту же очередь, что и upsert,
+    чтобы ещё не записанное добавление не вернуло подписчика после DELETE.
     """
+    if _subscriber_writer_task is not None and not _subscriber_writer_task.done():
+        _subscriber_queue.put_nowait((chat_id,))
+        user_languages.pop(chat_id, None)
+        user_expiration_preferences.pop(chat_id, None)
+        return
+    
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
-            await db.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))
+        async with _db_lock:
+            db = await _get_connection()
+            await db.execute(_DELETE_SUBSCRIBER_SQL, (chat_id,))
             await db.commit()
-        finally:
-            await db.close()
         
         user_languages.pop(chat_id, None)
         user_expiration_preferences.pop(chat_id, None)
@@ -388,29 +840,26 @@ async def load_subscribers_into_state() -> None:
     Load subscribers from DB into in-memory state on startup.
     """
     try:
-        db = await aiosqlite.connect(DB_PATH)
-        await optimize_db_connection(db)
-        try:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT chat_id, language, expiration_seconds
-                FROM subscribers
-            """)
+        async with _read_lock:
+            db = await _get_read_connection()
+            cursor = await db.execute(_SELECT_SUBSCRIBERS_SQL)
             rows = await cursor.fetchall()
             await cursor.close()
-        finally:
-            await db.close()
+        
+        # Один проход по строкам; общие контейнеры состояния обновляются на месте
+        users, languages, expirations = set(), {}, {}
+        for chat_id, language, expiration in rows:
+            users.add(chat_id)
+            languages[chat_id] = language or 'ru'
+            if expiration:
+                expirations[chat_id] = expiration
         
         SUBSCRIBED_USERS.clear()
-        SUBSCRIBED_USERS.update({row["chat_id"] for row in rows})
+        SUBSCRIBED_USERS.update(users)
         user_languages.clear()
+        user_languages.update(languages)
         user_expiration_preferences.clear()
-        for row in rows:
-            lang = row.get("language") or 'ru'
-            user_languages[row["chat_id"]] = lang
-            expiration = row.get("expiration_seconds")
-            if expiration:
-                user_expiration_preferences[row["chat_id"]] = expiration
+        user_expiration_preferences.update(expirations)
 
         logging.info(f"✓ Loaded {len(SUBSCRIBED_USERS)} subscribers from database")
     except Exception as e:
@@ -34,10 +34,11 @@ def calculate_ta_score(rsi: float, macd_diff: float, bb_position: float,
         TA score (0-100), where >50 is bullish, <50 is bearish
     """
     ta_score = 50  # Start neutral
+    adx_trend_threshold = CONFIG["adx_trend_threshold"]
     
     # CRITICAL FIX #1: Check trend direction first
     # For binary options, we MUST trade WITH the trend in strong trends
-    if trend_direction == "DOWNTREND" and adx > CONFIG.get("adx_trend_threshold", 25):
+    if trend_direction == "DOWNTREND" and adx > adx_trend_threshold:
         # Strong downtrend - bias score bearish but don’t immediately discard setups
         ta_score = 45  # start with bearish lean
         if rsi < 55:
@@ -52,7 +53,7 @@ def calculate_ta_score(rsi: float, macd_diff: float, bb_position: float,
             ta_score -= 2
         return max(0, min(100, ta_score))
     
-    if trend_direction == "UPTREND" and adx > CONFIG.get("adx_trend_threshold", 25):
+    if trend_direction == "UPTREND" and adx > adx_trend_threshold:
         # Strong uptrend - bias score bullish but keep flexibility
         ta_score = 55  # start with bullish lean
         if rsi > 45:
@@ -136,7 +137,7 @@ def calculate_ta_score(rsi: float, macd_diff: float, bb_position: float,
         ta_score -= 4
 
     # TREND STRENGTH: ADX (20% weight)
-    if adx > CONFIG["adx_trend_threshold"]:
+    if adx > adx_trend_threshold:
         if ta_score > 50:
             ta_score += 5
         elif ta_score < 50:
@@ -17,8 +17,8 @@ from .state import (
     last_atr_lock,
     INDICATOR_CACHE,
     indicator_cache_lock,
+    GPT_CACHE,
     METRICS,
-    metrics_lock,
     ALERT_HISTORY,
     ALERT_COOLDOWN_HOURS,
     alert_lock,
@@ -39,8 +39,8 @@ __all__ = [
     'last_atr_lock',
     'INDICATOR_CACHE',
     'indicator_cache_lock',
+    'GPT_CACHE',
     'METRICS',
-    'metrics_lock',
     'ALERT_HISTORY',
     'ALERT_COOLDOWN_HOURS',
     'alert_lock',
@@ -51,6 +51,9 @@ INDICATOR_CACHE: OrderedDict = OrderedDict()
 INDICATOR_CACHE_MAX_SIZE = 5  # Default fallback value
 indicator_cache_lock = asyncio.Lock()
 
+# Кеш ответов GPT по квантованным индикаторам: key -> (expires_at (monotonic), (score, reply))
+GPT_CACHE: OrderedDict = OrderedDict()
+
 # Метрики для мониторинга
 METRICS: Dict[str, Any] = {
     "api_calls": 0,
@@ -64,12 +67,12 @@ METRICS: Dict[str, Any] = {
     "candlestutor_calls": 0,
     "candlestutor_success": 0,
     "candlestutor_errors": 0,
-    "avg_response_time": 0.0,
     "total_response_time": 0.0,
     "response_count": 0,
     "start_time": datetime.now(),
 }
-metrics_lock = asyncio.Lock()
+# Счетчики METRICS инкрементируются без блокировки (без await это атомарно
+# в event loop); среднее время ответа считается при чтении
 
 # Отслеживание отправленных алертов для дедупликации
 ALERT_HISTORY: Dict[str, Optional[datetime]] = {
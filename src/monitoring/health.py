@@ -13,7 +13,6 @@ from ..models.state import (
     ALERT_HISTORY,
     ALERT_COOLDOWN_HOURS,
     stats_lock,
-    metrics_lock,
     alert_lock,
 )
 from ..utils.helpers import safe_divide
@@ -60,35 +59,37 @@ async def check_system_health(bot) -> None:
     try:
         now = datetime.now()
         
-        async with metrics_lock:
-            # Проверка API ошибок
-            total_api = METRICS["api_calls"] + METRICS["api_errors"]
-            if total_api > 0:
-                api_error_rate = safe_divide(METRICS["api_errors"], total_api, 0.0) * 100
-                if api_error_rate >= CONFIG["alert_api_error_rate"]:
-                    async with alert_lock:
-                        last_alert = ALERT_HISTORY.get("api_error")
-                        if last_alert is None or (now - last_alert).total_seconds() > (ALERT_COOLDOWN_HOURS * 3600):
-                            await send_alert(
-                                f"⚠️ High API error rate: {api_error_rate:.1f}%\n"
-                                f"API calls: {METRICS['api_calls']}, Errors: {METRICS['api_errors']}",
-                                bot
-                            )
-                            ALERT_HISTORY["api_error"] = now
-            
-            # Проверка GPT ошибок
-            if METRICS["gpt_calls"] > 0:
-                gpt_error_rate = safe_divide(METRICS["gpt_errors"], METRICS["gpt_calls"], 0.0) * 100
-                if gpt_error_rate > CONFIG["alert_gpt_error_rate"]:
-                    async with alert_lock:
-                        last_alert = ALERT_HISTORY.get("gpt_error")
-                        if last_alert is None or (now - last_alert).total_seconds() > (ALERT_COOLDOWN_HOURS * 3600):
-                            await send_alert(
-                                f"⚠️ High GPT error rate: {gpt_error_rate:.1f}%\n"
-                                f"GPT calls: {METRICS['gpt_calls']}, Errors: {METRICS['gpt_errors']}",
-                                bot
-                            )
-                            ALERT_HISTORY["gpt_error"] = now
+        # Снимок метрик: писатели инкрементируют счетчики без блокировки
+        m = dict(METRICS)
+        
+        # Проверка API ошибок
+        total_api = m["api_calls"] + m["api_errors"]
+        if total_api > 0:
+            api_error_rate = safe_divide(m["api_errors"], total_api, 0.0) * 100
+            if api_error_rate >= CONFIG["alert_api_error_rate"]:
+                async with alert_lock:
+                    last_alert = ALERT_HISTORY.get("api_error")
+                    if last_alert is None or (now - last_alert).total_seconds() > (ALERT_COOLDOWN_HOURS * 3600):
+                        await send_alert(
+                            f"⚠️ High API error rate: {api_error_rate:.1f}%\n"
+                            f"API calls: {m['api_calls']}, Errors: {m['api_errors']}",
+                            bot
+                        )
+                        ALERT_HISTORY["api_error"] = now
+        
+        # Проверка GPT ошибок
+        if m["gpt_calls"] > 0:
+            gpt_error_rate = safe_divide(m["gpt_errors"], m["gpt_calls"], 0.0) * 100
+            if gpt_error_rate > CONFIG["alert_gpt_error_rate"]:
+                async with alert_lock:
+                    last_alert = ALERT_HISTORY.get("gpt_error")
+                    if last_alert is None or (now - last_alert).total_seconds() > (ALERT_COOLDOWN_HOURS * 3600):
+                        await send_alert(
+                            f"⚠️ High GPT error rate: {gpt_error_rate:.1f}%\n"
+                            f"GPT calls: {m['gpt_calls']}, Errors: {m['gpt_errors']}",
+                            bot
+                        )
+                        ALERT_HISTORY["gpt_error"] = now
         
         # Проверка отсутствия сигналов
         async with stats_lock:
@@ -9,7 +9,7 @@ import re
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from ..config import CONFIG, get_openai_client
-from ..models.state import METRICS, metrics_lock
+from ..models.state import METRICS
 
 # Cooldown для GPT-запросов по инструменту (чтобы не спамить)
 _candlestutor_cooldown: Dict[str, datetime] = {}  # symbol -> last_request_time
@@ -193,8 +193,7 @@ async def call_candlestutor(
     # Проверка лимитов (внутри функции, чтобы генератор не думал об этом)
     if not await check_candlestutor_rate_limit():
         logging.warning("CandlesTutor rate limit exceeded, skipping")
-        async with metrics_lock:
-            METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
+        METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
         return None
     
     cooldown_minutes = CONFIG.get("candlestutor_cooldown_minutes", 2)
@@ -208,8 +207,7 @@ async def call_candlestutor(
         return None
     
     # Увеличиваем счетчик вызовов (даже если потом будет ошибка)
-    async with metrics_lock:
-        METRICS["candlestutor_calls"] = METRICS.get("candlestutor_calls", 0) + 1
+    METRICS["candlestutor_calls"] = METRICS.get("candlestutor_calls", 0) + 1
     
     # Формируем JSON для отправки
     input_data = {
@@ -330,9 +328,8 @@ async def call_candlestutor(
         else:
             result["pattern"] = pattern.strip()
         
-        async with metrics_lock:
-            METRICS["gpt_success"] += 1
-            METRICS["candlestutor_success"] = METRICS.get("candlestutor_success", 0) + 1
+        METRICS["gpt_success"] += 1
+        METRICS["candlestutor_success"] = METRICS.get("candlestutor_success", 0) + 1
         
         logging.info(
             f"CandlesTutor response: decision={decision}, "
@@ -342,16 +339,14 @@ async def call_candlestutor(
         return result
         
     except asyncio.TimeoutError:
-        async with metrics_lock:
-            METRICS["gpt_errors"] += 1
-            METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
+        METRICS["gpt_errors"] += 1
+        METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
         logging.error(f"CandlesTutor request timeout ({gpt_request_timeout}s)")
         return None
         
     except Exception as e:
-        async with metrics_lock:
-            METRICS["gpt_errors"] += 1
-            METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
+        METRICS["gpt_errors"] += 1
+        METRICS["candlestutor_errors"] = METRICS.get("candlestutor_errors", 0) + 1
         error_msg = str(e)[:100] if e else "Unknown error"
         error_type = type(e).__name__
         logging.error(f"CandlesTutor API error [{error_type}]: {error_msg}")
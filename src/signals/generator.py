@@ -4,13 +4,15 @@ Signal generation logic with GPT integration.
 
 import asyncio
 import logging
+import time
 import pandas as pd
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
-from ..config import CONFIG, get_openai_client
+from ..config import CONFIG, SYMBOL_SETTINGS, get_openai_client
 from ..config.settings import (
     DEFAULT_GPT_PROMPT_TEMPLATE,
     DEFAULT_GPT_SYSTEM_PROMPT,
+    XAUUSD_GPT_PROMPT_TEMPLATE,
 )
 from ..utils.symbols import normalize_symbol, symbol_to_pair, get_symbol_config
 from ..api import fetch_forex_data
@@ -23,11 +25,54 @@ from ..indicators import (
     detect_trend_direction,
     calculate_price_momentum,
 )
-from ..models.state import METRICS, metrics_lock
+from ..models.state import METRICS, GPT_CACHE
 from .utils import is_trading_hours
 from .candles_tutor import call_candlestutor, format_candles_for_tutor
 
 
+def _gpt_cache_key(
+    symbol: str,
+    rsi: float,
+    macd_diff: float,
+    price: float,
+    model: str,
+    temperature: float,
+    system_prompt: str,
+    prompt_template: str,
+) -> tuple:
+    """
+    Quantize the prompt inputs so near-identical ticks share a GPT answer.
+    
+    Model, temperature and prompts are part of the key, so a /config change
+    never serves answers produced with the previous settings.
+    """
+    return (
+        symbol, round(rsi), round(macd_diff, 5), round(price, 4),
+        model, temperature, system_prompt, prompt_template,
+    )
+
+
+def _gpt_cache_get(key: tuple) -> Optional[tuple]:
+    """Return a cached (score, reply) for key, or None if missing/expired."""
+    entry = GPT_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, result = entry
+    if time.monotonic() >= expires_at:
+        del GPT_CACHE[key]
+        return None
+    GPT_CACHE.move_to_end(key)
+    return result
+
+
+def _gpt_cache_put(key: tuple, result: tuple) -> None:
+    """Store a GPT (score, reply) with TTL, evicting least recently used entries."""
+    GPT_CACHE[key] = (time.monotonic() + CONFIG["gpt_cache_ttl_seconds"], result)
+    GPT_CACHE.move_to_end(key)
+    while len(GPT_CACHE) > CONFIG["gpt_cache_max_size"]:
+        GPT_CACHE.popitem(last=False)
+
+
 async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
     """
     Генерация торгового сигнала с поддержкой символов.
@@ -45,7 +90,7 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
         default_price = get_symbol_config(normalized_symbol, "default_price")
         
         # Get symbol-specific configuration
-        symbol_config = CONFIG.get("symbol_configs", {}).get(normalized_symbol, {})
+        symbol_settings = SYMBOL_SETTINGS.get(normalized_symbol)
         
         # Check trading hours
         if not is_trading_hours():
@@ -98,24 +143,28 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
         if CONFIG["use_gpt"] and use_gpt and client is not None:
             async def get_gpt_analysis():
                 """Get GPT analysis in background"""
-                rsi_state = "перепродан" if rsi < CONFIG.get("rsi_strong_oversold", 30) else (
-                    "перекуплен" if rsi > CONFIG.get("rsi_strong_overbought", 70) else "нейтральный"
-                )
-                macd_state = "положительный" if macd_diff > 0 else "отрицательный"
-
                 # Symbol-specific GPT prompt
                 if normalized_symbol == "XAUUSD":
-                    prompt_template = (
-                        "Ты трейдер-аналитик. Анализируй пару XAU/USD (золото). "
-                        "Учитывай корреляцию с DXY (обратная), новости по ФРС, инфляции, геополитике. "
-                        "Уровни: 2700, 2750, 2800. Волатильность выше, чем у EUR/USD.\n"
-                        "RSI: {rsi:.1f} ({rsi_state})\n"
-                        "MACD: {macd:.5f} ({macd_state})\n"
-                        "Цена: {price:.5f}\n\n"
-                        "Ответь ТОЛЬКО одним словом: BUY, SELL или NO_SIGNAL"
-                    )
+                    prompt_template = XAUUSD_GPT_PROMPT_TEMPLATE
                 else:
                     prompt_template = CONFIG.get("gpt_prompt_template", DEFAULT_GPT_PROMPT_TEMPLATE)
+                gpt_model = CONFIG.get("gpt_model", "gpt-4o-mini")
+                gpt_temperature = CONFIG.get("gpt_temperature", 0.1)
+                gpt_system_prompt = CONFIG.get("gpt_system_prompt", DEFAULT_GPT_SYSTEM_PROMPT)
+                
+                cache_key = _gpt_cache_key(
+                    normalized_symbol, rsi, macd_diff, current_price,
+                    gpt_model, gpt_temperature, gpt_system_prompt, prompt_template,
+                )
+                cached = _gpt_cache_get(cache_key)
+                if cached is not None:
+                    logging.debug(f"GPT cache hit for {normalized_symbol}")
+                    return cached
+                
+                rsi_state = "перепродан" if rsi < CONFIG.get("rsi_strong_oversold", 30) else (
+                    "перекуплен" if rsi > CONFIG.get("rsi_strong_overbought", 70) else "нейтральный"
+                )
+                macd_state = "положительный" if macd_diff > 0 else "отрицательный"
                 
                 prompt_context = {
                     "pair": pair,
@@ -126,19 +175,15 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
                     "price": current_price,
                 }
                 try:
-                    prompt = prompt_template.format(**prompt_context)
+                    prompt = prompt_template.format_map(prompt_context)
                 except Exception as fmt_error:
                     logging.warning(f"GPT prompt formatting error: {fmt_error}")
-                    prompt = DEFAULT_GPT_PROMPT_TEMPLATE.format(**prompt_context)
+                    prompt = DEFAULT_GPT_PROMPT_TEMPLATE.format_map(prompt_context)
 
-                gpt_model = CONFIG.get("gpt_model", "gpt-4o-mini")
-                gpt_temperature = CONFIG.get("gpt_temperature", 0.1)
                 gpt_max_tokens = CONFIG.get("gpt_max_tokens", 10)
                 gpt_request_timeout = CONFIG.get("gpt_request_timeout", 3.0)
-                gpt_system_prompt = CONFIG.get("gpt_system_prompt", DEFAULT_GPT_SYSTEM_PROMPT)
                 try:
-                    async with metrics_lock:
-                        METRICS["gpt_calls"] += 1
+                    METRICS["gpt_calls"] += 1
                     
                     resp = await asyncio.wait_for(
                         client.chat.completions.create(
@@ -168,19 +213,17 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
                     else:
                         score = 50
                     
-                    async with metrics_lock:
-                        METRICS["gpt_success"] += 1
+                    METRICS["gpt_success"] += 1
                     
+                    _gpt_cache_put(cache_key, (score, gpt_reply))
                     return (score, gpt_reply)
                         
                 except asyncio.TimeoutError:
-                    async with metrics_lock:
-                        METRICS["gpt_errors"] += 1
+                    METRICS["gpt_errors"] += 1
                     logging.warning(f"GPT request timeout ({gpt_request_timeout}s)")
                     return (50, "GPT timeout")
                 except Exception as e:
-                    async with metrics_lock:
-                        METRICS["gpt_errors"] += 1
+                    METRICS["gpt_errors"] += 1
                     error_msg = str(e)[:100] if e else "Unknown error"
                     error_type = type(e).__name__
                     logging.error(f"GPT API error [{error_type}]: {error_msg}")
@@ -234,7 +277,7 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
         confidence = calculate_confidence(rsi, macd_diff, bb_position, adx, stoch_k, preliminary_signal)
         
         # Use symbol-specific thresholds
-        base_min_buy = symbol_config.get("min_signal_score", CONFIG.get("min_signal_score", 60))
+        base_min_buy = symbol_settings.min_signal_score if symbol_settings else CONFIG.get("min_signal_score", 60)
         base_max_sell = CONFIG.get("max_sell_score", 40)
         
         # FIXED: Higher thresholds for binary options (was 55/45, now 65/35)
@@ -414,7 +457,7 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
             )
 
             # FIXED: Use final_score with momentum and confidence filters (только если CandlesTutor не вызван)
-            min_confidence = symbol_config.get("min_confidence", CONFIG.get("min_confidence", 70))
+            min_confidence = symbol_settings.min_confidence if symbol_settings else CONFIG.get("min_confidence", 70)
             momentum_penalty_score = CONFIG.get("momentum_penalty_score", 7)
             momentum_penalty_confidence = CONFIG.get("momentum_penalty_confidence", 5)
             decision_reasons = []
@@ -514,8 +557,7 @@ async def generate_signal(symbol: str = "EURUSD") -> Dict[str, Any]:
             )
         
         # Update metrics
-        async with metrics_lock:
-            METRICS["signals_generated"] += 1
+        METRICS["signals_generated"] += 1
         
         return {
             "signal": signal,
@@ -2,11 +2,37 @@
 Telegram bot keyboard definitions.
 """
 
+from functools import lru_cache
+from typing import Tuple
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from ..config import CONFIG
 from .localization import TEXTS
 
 
+_MAIN_KEYBOARD_BUTTONS = {
+    'ru': (
+        ("📊 СИГНАЛ", "📈 СТАТИСТИКА"),
+        ("⚙️ НАСТРОЙКИ", "📜 ИСТОРИЯ"),
+        ("📈 Активы",),
+    ),
+    'en': (
+        ("📊 SIGNAL", "📈 STATISTICS"),
+        ("⚙️ SETTINGS", "📜 HISTORY"),
+        ("📈 Symbols",),
+    ),
+}
+
+# Клавиатуры не меняются после создания - строим один раз на язык
+_MAIN_KEYBOARD_CACHE = {
+    lang: ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=text) for text in row] for row in rows],
+        resize_keyboard=True
+    )
+    for lang, rows in _MAIN_KEYBOARD_BUTTONS.items()
+}
+
+
 def get_main_keyboard(lang='ru'):
     """
     Создает главную клавиатуру для Telegram бота.
@@ -15,21 +41,9 @@ def get_main_keyboard(lang='ru'):
         lang: Язык интерфейса ('ru' или 'en')
         
     Returns:
-        ReplyKeyboardMarkup с основными кнопками
+        ReplyKeyboardMarkup с основными кнопками (общий экземпляр на язык)
     """
-    buttons = {
-        'ru': [
-            [KeyboardButton(text="📊 СИГНАЛ"), KeyboardButton(text="📈 СТАТИСТИКА")],
-            [KeyboardButton(text="⚙️ НАСТРОЙКИ"), KeyboardButton(text="📜 ИСТОРИЯ")],
-            [KeyboardButton(text="📈 Активы")]
-        ],
-        'en': [
-            [KeyboardButton(text="📊 SIGNAL"), KeyboardButton(text="📈 STATISTICS")],
-            [KeyboardButton(text="⚙️ SETTINGS"), KeyboardButton(text="📜 HISTORY")],
-            [KeyboardButton(text="📈 Symbols")]
-        ]
-    }
-    return ReplyKeyboardMarkup(keyboard=buttons[lang], resize_keyboard=True)
+    return _MAIN_KEYBOARD_CACHE[lang]
 
 
 language_keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -47,10 +61,31 @@ def _format_exp_label(seconds: int, lang: str) -> str:
     return template.format(value=minutes)
 
 
+@lru_cache(maxsize=64)
+def _build_expiration_keyboard(lang: str, layout: Tuple[Tuple[int, ...], ...]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(
+                text=_format_exp_label(seconds, lang),
+                callback_data=f"exp_select:{seconds}"
+            )
+            for seconds in row
+        ]
+        for row in layout
+    ])
+
+
+def _layout_key(layout) -> Tuple[Tuple[int, ...], ...]:
+    return tuple(tuple(row) for row in layout)
+
+
 def get_expiration_keyboard(lang: str = 'ru', symbol: str = None) -> InlineKeyboardMarkup:
     """
     Generate inline keyboard for expiration selection.
     
+    Keyboards are cached per (lang, layout), so a changed layout in CONFIG
+    produces a fresh keyboard without explicit invalidation.
+    
     Args:
         lang: Language code ('ru' or 'en')
         symbol: Trading symbol (EURUSD, XAUUSD) - if None, uses default
@@ -66,37 +101,23 @@ def get_expiration_keyboard(lang: str = 'ru', symbol: str = None) -> InlineKeybo
             symbol_config = CONFIG.get("symbol_configs", {}).get(normalized_symbol, {})
             layout = symbol_config.get("expiration_button_layout")
             if layout:
-                rows = []
-                for row in layout:
-                    inline_row = []
-                    for seconds in row:
-                        label = _format_exp_label(seconds, lang)
-                        inline_row.append(
-                            InlineKeyboardButton(
-                                text=label,
-                                callback_data=f"exp_select:{seconds}"
-                            )
-                        )
-                    rows.append(inline_row)
-                return InlineKeyboardMarkup(inline_keyboard=rows)
+                return _build_expiration_keyboard(lang, _layout_key(layout))
         except ValueError:
             pass  # Fallback to default if symbol invalid
     
     # Default layout (fallback)
-    rows = []
     layout = CONFIG.get("expiration_button_layout", [[5, 10, 30], [60, 120, 180]])
-    for row in layout:
-        inline_row = []
-        for seconds in row:
-            label = _format_exp_label(seconds, lang)
-            inline_row.append(
-                InlineKeyboardButton(
-                    text=label,
-                    callback_data=f"exp_select:{seconds}"
-                )
-            )
-        rows.append(inline_row)
-    return InlineKeyboardMarkup(inline_keyboard=rows)
+    return _build_expiration_keyboard(lang, _layout_key(layout))
+
+
+@lru_cache(maxsize=16)
+def _build_symbol_keyboard(symbols: Tuple[str, ...]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text=symbol, callback_data=f"symbol_{symbol}")
+            for symbol in symbols
+        ]
+    ])
 
 
 def get_symbol_keyboard(lang: str = 'ru') -> InlineKeyboardMarkup:
@@ -109,12 +130,4 @@ def get_symbol_keyboard(lang: str = 'ru') -> InlineKeyboardMarkup:
     Returns:
         InlineKeyboardMarkup with symbol selection buttons
     """
-    symbols = CONFIG.get("symbols", ["EURUSD", "XAUUSD"])
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text=symbol, callback_data=f"symbol_{symbol}")
-            for symbol in symbols
-        ]
-    ])
-    return keyboard
-
+    return _build_symbol_keyboard(tuple(CONFIG.get("symbols", ["EURUSD", "XAUUSD"])))
@@ -14,10 +14,18 @@ from pathlib import Path
 AUDIT_LOG_DIR = "logs"
 AUDIT_LOG_FILE = os.path.join(AUDIT_LOG_DIR, "audit.log")
 
+# Аудит включен по умолчанию; AUDIT_LOG=0/false/off отключает запись целиком
+AUDIT_ENABLED = os.getenv("AUDIT_LOG", "1").strip().lower() not in ("0", "false", "off", "no")
+
+_audit_dir_ready = False
+
 
 def ensure_audit_log_dir():
-    """Ensure audit log directory exists."""
-    os.makedirs(AUDIT_LOG_DIR, exist_ok=True)
+    """Ensure audit log directory exists (checked once per process)."""
+    global _audit_dir_ready
+    if not _audit_dir_ready:
+        os.makedirs(AUDIT_LOG_DIR, exist_ok=True)
+        _audit_dir_ready = True
 
 
 def _write_audit_log_sync(audit_entry: dict) -> None:
@@ -42,6 +50,8 @@ async def log_config_change(user_id: int, param: str, old_value: Any, new_value:
         old_value: Previous value
         new_value: New value
     """
+    if not AUDIT_ENABLED:
+        return
     ensure_audit_log_dir()
     
     audit_entry = {
@@ -72,6 +82,8 @@ async def log_admin_action(user_id: int, action: str, details: Optional[dict] =
         action: Action description
         details: Optional additional details dictionary
     """
+    if not AUDIT_ENABLED:
+        return
     ensure_audit_log_dir()
     
     audit_entry = {
@@ -102,6 +114,19 @@ async def log_security_event(user_id: Optional[int], event_type: str, descriptio
         description: Event description
         severity: Event severity ('low', 'medium', 'high', 'critical')
     """
+    # Log to main log with appropriate level based on severity
+    if severity == 'critical':
+        log_level = logging.CRITICAL
+    elif severity == 'high':
+        log_level = logging.ERROR
+    elif severity == 'medium':
+        log_level = logging.WARNING
+    else:
+        log_level = logging.INFO
+    logging.log(log_level, "Security event: %s - %s (user: %s)", event_type, description, user_id)
+    
+    if not AUDIT_ENABLED:
+        return
     ensure_audit_log_dir()
     
     audit_entry = {
@@ -118,16 +143,5 @@ async def log_security_event(user_id: Optional[int], event_type: str, descriptio
         # Use executor to avoid blocking event loop
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(None, _write_audit_log_sync, audit_entry)
-        
-        # Log to main log with appropriate level based on severity
-        if severity == 'critical':
-            logging.critical(f"Security event: {event_type} - {description} (user: {user_id})")
-        elif severity == 'high':
-            logging.error(f"Security event: {event_type} - {description} (user: {user_id})")
-        elif severity == 'medium':
-            logging.warning(f"Security event: {event_type} - {description} (user: {user_id})")
-        else:
-            logging.info(f"Security event: {event_type} - {description} (user: {user_id})")
     except Exception as e:
         logging.error(f"Failed to write audit log: {e}")
-
@@ -2,10 +2,23 @@
 Helper utility functions.
 """
 
+import json
 import re
 from datetime import datetime
 from typing import Optional
 
+try:
+    import orjson
+    # orjson быстрее stdlib json; принимает и str, и bytes
+    json_loads = orjson.loads
+except ImportError:  # optional dependency
+    json_loads = json.loads
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# Pattern: alphanumeric, underscore, slash, equals, dash, whitespace
+_CONFIG_INPUT_RE = re.compile(r'[a-zA-Z0-9_/\s=-]+')
+
 
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
     """
@@ -77,7 +90,7 @@ def sanitize_user_input(text: Optional[str], max_length: int = 200,
     # Удаляем опасные символы
     text = text.strip()
     # Удаляем множественные пробелы
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     # Ограничиваем длину
     if len(text) > max_length:
         return None
@@ -103,9 +116,7 @@ def validate_config_input(text: str) -> bool:
     """
     if not text or not isinstance(text, str):
         return False
-    # Pattern: alphanumeric, underscore, equals, dash, space
-    pattern = re.compile(r'^[a-zA-Z0-9_/\s=-]+$')
-    return bool(pattern.match(text))
+    return _CONFIG_INPUT_RE.fullmatch(text) is not None
 
 
 def format_expiration_text(seconds: int, t: dict) -> str:
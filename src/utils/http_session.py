@@ -9,6 +9,23 @@ from typing import Optional
 # Глобальный HTTP session для переиспользования
 http_session: Optional[aiohttp.ClientSession] = None
 
+# Общий таймаут для всех запросов сессии (вместо timeout=10 в каждом вызове)
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+def _create_session() -> aiohttp.ClientSession:
+    """Создать сессию с keep-alive пулом соединений и кэшем DNS."""
+    # Хостов немного и они фиксированы (Twelve Data, Alpha Vantage):
+    # ограничиваем пул на хост, чтобы повторы не забивали общий лимит
+    connector = aiohttp.TCPConnector(
+        limit=64,
+        limit_per_host=8,
+        ttl_dns_cache=600,
+        keepalive_timeout=75,
+        happy_eyeballs_delay=0.1,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+
 
 async def get_http_session() -> aiohttp.ClientSession:
     """
@@ -16,6 +33,7 @@ async def get_http_session() -> aiohttp.ClientSession:
     
     Создает новую сессию только если она не существует или была закрыта.
     Это позволяет переиспользовать соединения и повысить производительность.
+    Таймаут запросов (10s) задан на уровне сессии.
     
     Returns:
         Глобальная HTTP сессия для API запросов
@@ -28,13 +46,13 @@ async def get_http_session() -> aiohttp.ClientSession:
     global http_session
     try:
         if http_session is None or http_session.closed:
-            http_session = aiohttp.ClientSession()
+            http_session = _create_session()
             logging.info("✓ Created new HTTP session")
         return http_session
     except Exception as e:
         logging.error(f"Error creating HTTP session: {e}")
         # Создаем новую сессию при ошибке
-        http_session = aiohttp.ClientSession()
+        http_session = _create_session()
         return http_session
 
 
@@ -2,6 +2,8 @@
 Symbol normalization utilities for different API providers.
 """
 
+from functools import lru_cache
+
 # Symbol mapping: internal symbol -> API-specific formats
 SYMBOL_MAP = {
     "EURUSD": {
@@ -23,10 +25,13 @@ SYMBOL_MAP = {
 }
 
 
+@lru_cache(maxsize=64)
 def normalize_symbol(symbol: str) -> str:
     """
     Normalize symbol to internal format (uppercase, no separators).
     
+    Results are memoized; errors are not cached and re-raise on every call.
+    
     Args:
         symbol: Symbol in any format (EURUSD, EUR/USD, eurusd, etc.)
         
@@ -45,6 +50,7 @@ def normalize_symbol(symbol: str) -> str:
     raise ValueError(f"Unsupported symbol: {symbol}")
 
 
+@lru_cache(maxsize=64)
 def symbol_to_pair(symbol: str) -> str:
     """
     Convert symbol to pair format (EURUSD -> EUR/USD).
@@ -54,6 +54,18 @@ def mock_config():
         "timezone_offset": 4,
     }
 
+@pytest.fixture
+def mock_datetime():
+    """Patch datetime in the main module and in src.signals.utils with one mock.
+
+    Time helpers live in src.signals.utils, so patching only
+    PocSocSig_Enhanced.datetime is not enough.
+    """
+    mock_dt = MagicMock(wraps=datetime)
+    with patch("PocSocSig_Enhanced.datetime", mock_dt), \
+         patch("src.signals.utils.datetime", mock_dt):
+        yield mock_dt
+
 @pytest.fixture
 def sample_forex_dataframe():
     """Create a sample DataFrame with forex data for testing"""
@@ -133,6 +145,7 @@ def reset_globals():
     PocSocSig_Enhanced.user_languages.clear()
     state_module.user_languages.clear()
     PocSocSig_Enhanced.API_CACHE.clear()
+    state_module.GPT_CACHE.clear()
     yield
     # Cleanup after test
     PocSocSig_Enhanced.STATS = {
@@ -155,6 +168,7 @@ def reset_globals():
     PocSocSig_Enhanced.user_languages.clear()
     state_module.user_languages.clear()
     PocSocSig_Enhanced.API_CACHE.clear()
+    state_module.GPT_CACHE.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -190,7 +204,14 @@ def stub_aiosqlite_connect():
 
     connect_mock = MagicMock(side_effect=_connect_stub)
 
+    # Общее соединение репозитория не должно переживать тест
+    repository_module._db = None
+    repository_module._read_db = None
+    repository_module._recent_signals.clear()
     with patch.object(repository_module.aiosqlite, "connect", connect_mock), \
          patch("PocSocSig_Enhanced.aiosqlite.connect", connect_mock):
         yield
+    repository_module._db = None
+    repository_module._read_db = None
+    repository_module._recent_signals.clear()
 
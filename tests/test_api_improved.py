@@ -156,3 +156,18 @@ class TestAPIImproved:
                 # Cache should not exceed max size
                 assert len(PocSocSig_Enhanced.API_CACHE) <= PocSocSig_Enhanced.CACHE_MAX_SIZE
 
+    def test_cache_eviction_keeps_hot_entry(self):
+        """Eviction prefers a cold entry over an older but frequently hit one"""
+        import time
+        from src.api.fetcher import CachedFrame, _evict_one
+        
+        PocSocSig_Enhanced.API_CACHE.clear()
+        try:
+            PocSocSig_Enhanced.API_CACHE["forex_data:EURUSD"] = CachedFrame(time.monotonic(), None, 10)
+            PocSocSig_Enhanced.API_CACHE["forex_data:XAUUSD"] = CachedFrame(time.monotonic(), None, 0)
+            
+            _evict_one()
+            
+            assert list(PocSocSig_Enhanced.API_CACHE) == ["forex_data:EURUSD"]
+        finally:
+            PocSocSig_Enhanced.API_CACHE.clear()
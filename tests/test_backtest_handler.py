@@ -29,26 +29,18 @@ class TestBacktestHandler:
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         STATE_SUBSCRIBERS.add(12345)
         
-        # Add some signals to database
-        with patch('PocSocSig_Enhanced.load_recent_signals_from_db', new_callable=AsyncMock) as mock_load:
-            mock_load.return_value = [
-                {
-                    "signal": "BUY",
-                    "price": 1.0800,
-                    "score": 65,
-                    "confidence": 60,
-                    "time": datetime.now(),
-                    "atr": 0.0003
+        # Aggregated stats as returned by the database layer
+        with patch('PocSocSig_Enhanced.load_backtest_stats_from_db', new_callable=AsyncMock) as mock_load:
+            mock_load.return_value = {
+                "total": 2,
+                "avg_confidence": 60.0,
+                "first_time": datetime.now(),
+                "last_time": datetime.now(),
+                "by_signal": {
+                    "BUY": {"count": 1, "high_confidence": 0},
+                    "SELL": {"count": 1, "high_confidence": 0},
                 },
-                {
-                    "signal": "SELL",
-                    "price": 1.0850,
-                    "score": 35,
-                    "confidence": 60,
-                    "time": datetime.now(),
-                    "atr": 0.0004
-                }
-            ]
+            }
             
             with patch('PocSocSig_Enhanced.bot'):
                 await PocSocSig_Enhanced.backtest_handler(mock_message)
@@ -71,8 +63,14 @@ class TestBacktestHandler:
         STATE_SUBSCRIBERS.add(12345)
         
         # Mock empty database
-        with patch('PocSocSig_Enhanced.load_recent_signals_from_db', new_callable=AsyncMock) as mock_load:
-            mock_load.return_value = []
+        with patch('PocSocSig_Enhanced.load_backtest_stats_from_db', new_callable=AsyncMock) as mock_load:
+            mock_load.return_value = {
+                "total": 0,
+                "avg_confidence": 0.0,
+                "first_time": None,
+                "last_time": None,
+                "by_signal": {},
+            }
             
             with patch('PocSocSig_Enhanced.bot'):
                 await PocSocSig_Enhanced.backtest_handler(mock_message)
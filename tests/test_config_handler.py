@@ -19,7 +19,7 @@ class TestConfigHandler:
         # Clear state from both locations
         PocSocSig_Enhanced.SUBSCRIBED_USERS.clear()
         PocSocSig_Enhanced.user_languages.clear()
-        PocSocSig_Enhanced.ADMIN_USER_IDS.clear()
+        PocSocSig_Enhanced.set_admin_user_ids(())
         STATE_SUBSCRIBERS.clear()
         STATE_LANGUAGES.clear()
     
@@ -35,7 +35,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -63,7 +63,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -91,7 +91,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -122,7 +122,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -145,7 +145,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -173,7 +173,7 @@ class TestConfigHandler:
         # Add user to subscribed and admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
         PocSocSig_Enhanced.user_languages[12345] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
         STATE_SUBSCRIBERS.add(12345)
         STATE_LANGUAGES[12345] = 'ru'
         
@@ -226,7 +226,7 @@ class TestConfigHandler:
         # Add user to subscribed but NOT to admin list
         PocSocSig_Enhanced.SUBSCRIBED_USERS.add(99999)
         PocSocSig_Enhanced.user_languages[99999] = 'ru'
-        PocSocSig_Enhanced.ADMIN_USER_IDS.discard(99999)  # Ensure not admin
+        PocSocSig_Enhanced.set_admin_user_ids(PocSocSig_Enhanced.ADMIN_USER_IDS - {99999})  # Ensure not admin
         STATE_SUBSCRIBERS.add(99999)
         STATE_LANGUAGES[99999] = 'ru'
         
@@ -70,6 +70,54 @@ class TestDataFetching:
             assert result is not None
             assert isinstance(result, pd.DataFrame)
     
+    @pytest.mark.asyncio
+    async def test_fetched_frame_is_read_only(self):
+        """The frame cached and returned to callers rejects in-place writes"""
+        fresh_df = pd.DataFrame({
+            'time': pd.date_range('2025-01-01', periods=20, freq='min'),
+            'open': [1.08] * 20,
+            'high': [1.081] * 20,
+            'low': [1.079] * 20,
+            'close': [1.0805] * 20,
+            'volume': [1000] * 20
+        })
+        
+        with patch('src.api.fetcher.fetch_forex_data_parallel', new_callable=AsyncMock) as mock_parallel:
+            mock_parallel.return_value = (fresh_df, "twelvedata")
+            with patch.dict(PocSocSig_Enhanced.CONFIG, {"api_source": "auto"}):
+                result = await PocSocSig_Enhanced.fetch_forex_data("EURUSD", max_retries=1)
+                cached = await PocSocSig_Enhanced.fetch_forex_data("EURUSD", max_retries=1)
+        
+        assert cached is result
+        with pytest.raises(ValueError):
+            result.loc[result.index[0], 'close'] = 0.0
+        with pytest.raises(ValueError):
+            result.iloc[0, result.columns.get_loc('volume')] = 0
+        assert float(cached['close'].iloc[0]) == 1.0805
+    
+    @pytest.mark.asyncio
+    async def test_unfrozen_frame_served_as_copy(self):
+        """Without a freezable block manager callers get copies of the cached frame"""
+        fresh_df = pd.DataFrame({
+            'time': pd.date_range('2025-01-01', periods=20, freq='min'),
+            'open': [1.08] * 20,
+            'high': [1.081] * 20,
+            'low': [1.079] * 20,
+            'close': [1.0805] * 20,
+            'volume': [1000] * 20
+        })
+        
+        with patch('src.api.fetcher.fetch_forex_data_parallel', new_callable=AsyncMock) as mock_parallel:
+            mock_parallel.return_value = (fresh_df, "twelvedata")
+            with patch('src.api.fetcher._freeze_frame', return_value=False):
+                with patch.dict(PocSocSig_Enhanced.CONFIG, {"api_source": "auto"}):
+                    result = await PocSocSig_Enhanced.fetch_forex_data("EURUSD", max_retries=1)
+                    result.loc[result.index[0], 'close'] = 0.0
+                    cached = await PocSocSig_Enhanced.fetch_forex_data("EURUSD", max_retries=1)
+        
+        assert cached is not result
+        assert float(cached['close'].iloc[0]) == 1.0805
+    
     @pytest.mark.asyncio
     async def test_fetch_forex_data_api_failure(self, mock_http_session):
         """Test handling of API failure"""
@@ -99,6 +99,52 @@ class TestDatabase:
                 assert "signal" in signals[0]
                 assert "price" in signals[0]
     
+    @pytest.mark.asyncio
+    async def test_recent_signals_served_from_buffer(self):
+        """Recently saved signals are returned without querying the database"""
+        from src.database import repository as repository_module
+
+        base = {"price": 1.0800, "score": 65, "confidence": 60, "indicators": {"rsi": 30.5, "macd": 0.0001}}
+        with patch.object(repository_module, '_write_signals', new_callable=AsyncMock, return_value=True):
+            repository_module.start_signal_writer()
+            for i, signal in enumerate(["BUY", "SELL", "BUY"]):
+                await PocSocSig_Enhanced.save_signal_to_db(
+                    {**base, "signal": signal, "reasoning": f"r{i}", "time": datetime(2024, 1, 1, 12, i)}
+                )
+            await repository_module.stop_signal_writer()
+
+        with patch.object(repository_module, '_get_read_connection', new_callable=AsyncMock) as mock_read:
+            signals = await PocSocSig_Enhanced.load_recent_signals_from_db(limit=2)
+            stripped = await PocSocSig_Enhanced.load_recent_signals_from_db(limit=2, with_reasoning=False)
+
+        mock_read.assert_not_called()
+        assert [s["signal"] for s in signals] == ["SELL", "BUY"]
+        assert [s["reasoning"] for s in signals] == ["r1", "r2"]
+        assert signals[-1]["time"] == datetime(2024, 1, 1, 12, 2)
+        assert [s["reasoning"] for s in stripped] == ["", ""]
+        signals[0]["indicators"]["rsi"] = 0.0
+        assert repository_module._recent_signals[1]["indicators"]["rsi"] == 30.5
+
+    @pytest.mark.asyncio
+    async def test_failed_signal_write_not_buffered(self):
+        """Signals whose batch failed to commit are not served from the buffer"""
+        from src.database import repository as repository_module
+
+        signal_data = {
+            "signal": "BUY",
+            "price": 1.0800,
+            "score": 65,
+            "confidence": 60,
+            "time": datetime.now(),
+            "indicators": {"rsi": 30.5, "macd": 0.0001},
+        }
+        with patch.object(repository_module, '_write_signals', new_callable=AsyncMock, return_value=False):
+            repository_module.start_signal_writer()
+            await PocSocSig_Enhanced.save_signal_to_db(signal_data)
+            await repository_module.stop_signal_writer()
+
+        assert len(repository_module._recent_signals) == 0
+    
     @pytest.mark.asyncio
     async def test_backup_database(self):
         """Test database backup functionality"""
@@ -172,6 +218,65 @@ class TestDatabase:
             mock_db.execute.assert_called()
             mock_db.commit.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_subscriber_writer_coalesces_updates(self):
+        """Queued subscriber updates are batched, keeping the latest per chat_id"""
+        from src.database import repository as repository_module
+
+        with patch.object(repository_module, '_write_subscribers', new_callable=AsyncMock) as mock_write:
+            repository_module.start_subscriber_writer()
+            await PocSocSig_Enhanced.add_subscriber_to_db(12345, 'ru')
+            await PocSocSig_Enhanced.add_subscriber_to_db(12345, 'en', 90)
+            await PocSocSig_Enhanced.add_subscriber_to_db(777, 'en')
+            await repository_module.stop_subscriber_writer()
+
+        written = [row for call in mock_write.call_args_list for row in call.args[0]]
+        assert sorted((row[0], row[1], row[2]) for row in written) == [
+            (777, 'en', None),
+            (12345, 'en', 90),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_subscriber_removed_within_flush_window(self):
+        """A removal queued after an add in the same flush window wins"""
+        from src.database import repository as repository_module
+
+        with patch.object(repository_module, '_write_subscribers', new_callable=AsyncMock) as mock_write:
+            repository_module.start_subscriber_writer()
+            await PocSocSig_Enhanced.add_subscriber_to_db(42, 'en')
+            await PocSocSig_Enhanced.add_subscriber_to_db(1, 'ru')
+            await PocSocSig_Enhanced.remove_subscriber_from_db(42)
+            await repository_module.stop_subscriber_writer()
+
+        written = [row for call in mock_write.call_args_list for row in call.args[0]]
+        assert (42,) in written
+        assert [row[0] for row in written if len(row) > 1] == [1]
+
+    @pytest.mark.asyncio
+    async def test_signal_writer_batches_inserts(self):
+        """Queued signals are flushed in chunks of db_insert_batch_size"""
+        from src.database import repository as repository_module
+
+        signal_data = {
+            "signal": "SELL",
+            "price": 1.0800,
+            "score": 40,
+            "confidence": 70,
+            "time": datetime.now(),
+            "indicators": {"rsi": 70.5, "macd": -0.0001},
+        }
+
+        with patch.dict(repository_module.CONFIG, {"db_insert_batch_size": 2}):
+            with patch.object(repository_module, '_write_signals', new_callable=AsyncMock) as mock_write:
+                repository_module.start_signal_writer()
+                for _ in range(5):
+                    await PocSocSig_Enhanced.save_signal_to_db(signal_data)
+                await repository_module.stop_signal_writer()
+
+        batches = [call.args[0] for call in mock_write.call_args_list]
+        assert sum(len(batch) for batch in batches) == 5
+        assert all(len(batch) <= 2 for batch in batches)
+
     @pytest.mark.asyncio
     async def test_remove_subscriber_from_db(self):
         """Ensure subscribers can be removed"""
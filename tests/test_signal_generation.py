@@ -120,7 +120,48 @@ class TestSignalGeneration:
                                 assert "score" in result
                                 # GPT should influence reasoning (mock returns BUY)
                                 assert result["reasoning"] == "BUY"
-    
+
+    @pytest.mark.asyncio
+    async def test_gpt_answer_cached_for_same_indicators(self, sample_forex_dataframe, mock_gpt_client):
+        """Repeated analysis of identical data reuses the cached GPT answer"""
+        with patch('src.signals.generator.fetch_forex_data', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = sample_forex_dataframe
+            with patch('src.signals.generator.is_trading_hours', return_value=True):
+                with patch.dict(PocSocSig_Enhanced.CONFIG, {"use_gpt": True}):
+                    with patch('src.signals.generator.get_openai_client', return_value=(mock_gpt_client, True)):
+                        first = await PocSocSig_Enhanced.generate_signal("EURUSD")
+                        second = await PocSocSig_Enhanced.generate_signal("EURUSD")
+
+        assert mock_gpt_client.chat.completions.create.call_count == 1
+        assert first["reasoning"] == second["reasoning"] == "BUY"
+
+    @pytest.mark.asyncio
+    async def test_gpt_cache_not_reused_after_config_command(self, sample_forex_dataframe, mock_gpt_client):
+        """/config gpt_model=... makes the next analysis query the new model"""
+        message = MagicMock()
+        message.chat.id = 12345
+        message.text = "/config gpt_model=gpt-4o"
+        message.answer = AsyncMock()
+        message.message = None  # Message, not CallbackQuery
+        PocSocSig_Enhanced.SUBSCRIBED_USERS.add(12345)
+        PocSocSig_Enhanced.set_admin_user_ids({12345})
+        
+        try:
+            with patch('src.signals.generator.fetch_forex_data', new_callable=AsyncMock) as mock_fetch:
+                mock_fetch.return_value = sample_forex_dataframe
+                with patch('src.signals.generator.is_trading_hours', return_value=True):
+                    with patch.dict(PocSocSig_Enhanced.CONFIG, {"use_gpt": True, "gpt_model": "gpt-4o-mini"}):
+                        with patch('src.signals.generator.get_openai_client', return_value=(mock_gpt_client, True)):
+                            await PocSocSig_Enhanced.generate_signal("EURUSD")
+                            await PocSocSig_Enhanced.config_handler(message)
+                            assert PocSocSig_Enhanced.CONFIG["gpt_model"] == "gpt-4o"
+                            await PocSocSig_Enhanced.generate_signal("EURUSD")
+        finally:
+            PocSocSig_Enhanced.set_admin_user_ids(())
+        
+        assert mock_gpt_client.chat.completions.create.call_count == 2
+        assert mock_gpt_client.chat.completions.create.call_args.kwargs["model"] == "gpt-4o"
+
     @pytest.mark.asyncio
     async def test_signal_score_range(self, sample_forex_dataframe):
         """Test that signal score is always between 0 and 100"""